@@ -0,0 +1,125 @@
+"""
+Numeric kernels for URL feature extraction
+
+Shannon entropy and the randomness score are tight numeric loops invoked
+for every URL (and again for the domain). They operate on uint8 views of
+the URL bytes so the hot path avoids per-character Python iteration.
+When Numba is available the kernels are JIT-compiled; otherwise a
+vectorized NumPy fallback is used.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+
+# 256-entry lookup marking ASCII alphanumeric bytes (for the randomness score)
+_ALNUM_MASK = np.zeros(256, dtype=np.uint8)
+for _b in b'0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ':
+    _ALNUM_MASK[_b] = 1
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True)
+    def shannon_entropy_u8(buf):
+        """Shannon entropy (bits per byte) of a uint8 buffer"""
+        if buf.size == 0:
+            return 0.0
+
+        hist = np.zeros(256, dtype=np.int64)
+        for i in range(buf.size):
+            hist[buf[i]] += 1
+
+        entropy = 0.0
+        length = float(buf.size)
+        for count in hist:
+            if count > 0:
+                probability = count / length
+                entropy -= probability * np.log2(probability)
+
+        return entropy
+
+    @njit(cache=True, fastmath=True)
+    def url_randomness_u8(buf, alnum_mask=_ALNUM_MASK):
+        """Fraction of adjacent alphanumeric bytes that differ"""
+        prev = -1
+        changes = 0
+        pairs = 0
+
+        for i in range(buf.size):
+            b = buf[i]
+            if alnum_mask[b]:
+                if prev >= 0:
+                    pairs += 1
+                    if b != prev:
+                        changes += 1
+                prev = b
+
+        if pairs == 0:
+            return 0.0
+
+        return changes / pairs
+
+    @njit(parallel=True, cache=True, fastmath=True)
+    def entropy_batch(buf, lens):
+        """Per-row Shannon entropy over a padded (n, maxlen) uint8 matrix"""
+        n = buf.shape[0]
+        out = np.empty(n, dtype=np.float64)
+
+        for i in prange(n):
+            hist = np.zeros(256, dtype=np.int32)
+            length = lens[i]
+            for j in range(length):
+                hist[buf[i, j]] += 1
+
+            entropy = 0.0
+            for count in hist:
+                if count > 0:
+                    probability = count / length
+                    entropy -= probability * np.log2(probability)
+            out[i] = entropy
+
+        return out
+
+    # Warm up the JIT on tiny inputs so the first real request
+    # doesn't pay the compilation cost
+    _warmup = np.zeros(1, dtype=np.uint8)
+    shannon_entropy_u8(_warmup)
+    url_randomness_u8(_warmup)
+    entropy_batch(np.zeros((1, 1), dtype=np.uint8), np.ones(1, dtype=np.int32))
+
+else:
+
+    def shannon_entropy_u8(buf):
+        """Shannon entropy (bits per byte) of a uint8 buffer"""
+        if buf.size == 0:
+            return 0.0
+
+        hist = np.bincount(buf, minlength=256)
+        probabilities = hist[hist > 0] / buf.size
+
+        return float(-(probabilities * np.log2(probabilities)).sum())
+
+    def url_randomness_u8(buf, alnum_mask=_ALNUM_MASK):
+        """Fraction of adjacent alphanumeric bytes that differ"""
+        alnum = buf[alnum_mask[buf] == 1]
+
+        if alnum.size < 2:
+            return 0.0
+
+        return float(np.count_nonzero(alnum[1:] != alnum[:-1]) / (alnum.size - 1))
+
+    def entropy_batch(buf, lens):
+        """Per-row Shannon entropy over a padded (n, maxlen) uint8 matrix"""
+        n = buf.shape[0]
+        out = np.empty(n, dtype=np.float64)
+
+        for i in range(n):
+            out[i] = shannon_entropy_u8(buf[i, :lens[i]])
+
+        return out
@@ -11,11 +11,101 @@ Total: 20 features
 """
 
 import re
-import math
-from urllib.parse import urlparse
+from functools import lru_cache
 import tldextract
 import numpy as np
-from collections import Counter
+
+try:
+    import ahocorasick
+except ImportError:
+    # Optional accelerator - falls back to per-keyword substring scan
+    ahocorasick = None
+
+try:
+    from ._fe_kernels import shannon_entropy_u8, url_randomness_u8
+except ImportError:
+    # Allow running this module directly as a script
+    from _fe_kernels import shannon_entropy_u8, url_randomness_u8
+
+
+# Precompiled IPv4 pattern - hoisted so the hot path skips the re-cache lookup
+_IPV4_RE = re.compile(r'\d{1,3}(?:\.\d{1,3}){3}')
+
+# Deleting the digit characters in one translate pass is the cheapest way
+# to ask "does this string contain a digit" without a Python-level loop
+_DIGIT_REMOVER = str.maketrans('', '', '0123456789')
+
+
+# Module-level tldextract instance using only the bundled public-suffix
+# snapshot - avoids the HTTP fetch and disk cache on first use
+_TLD_EXTRACT = tldextract.TLDExtract(suffix_list_urls=())
+
+
+def _fast_split(url: str) -> tuple:
+    """
+    Minimal URL split into (scheme, host, path, query)
+
+    Finds the few separators the features need with C-level str.find
+    instead of building a full ParseResult; tldextract then handles the
+    host, so the URL is only tokenized once
+    """
+    scheme = ''
+    rest = url
+    sep = url.find('://')
+    if sep != -1:
+        scheme = url[:sep]
+        rest = url[sep + 3:]
+
+    # Authority ends at the first '/', '?' or '#'
+    host_end = len(rest)
+    for delimiter in '/?#':
+        pos = rest.find(delimiter)
+        if pos != -1 and pos < host_end:
+            host_end = pos
+    host = rest[:host_end]
+
+    # Path and query, dropping any fragment
+    tail = rest[host_end:]
+    frag = tail.find('#')
+    if frag != -1:
+        tail = tail[:frag]
+
+    qpos = tail.find('?')
+    if qpos != -1:
+        path = tail[:qpos]
+        query = tail[qpos + 1:]
+    else:
+        path = tail
+        query = ''
+
+    return scheme, host, path, query
+
+
+@lru_cache(maxsize=16384)
+def _extract_host_parts(netloc: str):
+    """
+    tldextract result cached per hostname
+    Scans typically hit the same host many times, so the public-suffix
+    walk only runs once per distinct hostname
+    """
+    return _TLD_EXTRACT(netloc)
+
+
+def _char_class_lut(chars: bytes) -> np.ndarray:
+    """Build a 256-entry membership lookup table for a character class"""
+    lut = np.zeros(256, dtype=np.uint8)
+    for byte in chars:
+        lut[byte] = 1
+    return lut
+
+
+# Precompiled lookup tables - one np.take + sum replaces a Python-level
+# generator scan per character class
+_VOWEL_LUT = _char_class_lut(b'aeiouAEIOU')
+_CONSONANT_LUT = _char_class_lut(b'bcdfghjklmnpqrstvwxyzBCDFGHJKLMNPQRSTVWXYZ')
+_DIGIT_LUT = _char_class_lut(b'0123456789')
+_LETTER_LUT = _VOWEL_LUT | _CONSONANT_LUT
+_ALNUM_LUT = _LETTER_LUT | _DIGIT_LUT
 
 
 class AdvancedFeatureExtractor:
@@ -31,7 +121,23 @@ class AdvancedFeatureExtractor:
             'activity', 'alert', 'security', 'notification', 'password',
             'credential', 'validate', 'authenticate', 'billing'
         ]
-        
+
+        # Build Aho-Corasick automaton once so keyword counting is a single
+        # O(N) pass over the URL instead of one substring scan per keyword
+        if ahocorasick is not None:
+            self._keyword_automaton = ahocorasick.Automaton()
+            for keyword in self.suspicious_keywords:
+                self._keyword_automaton.add_word(keyword, keyword)
+            self._keyword_automaton.make_automaton()
+        else:
+            self._keyword_automaton = None
+
+        # Compiled alternation for short URLs, where the regex engine's
+        # lower fixed overhead beats the automaton; also the fallback path
+        self._keyword_re = re.compile(
+            '|'.join(re.escape(keyword) for keyword in self.suspicious_keywords)
+        )
+
         self.suspicious_tlds = [
             '.tk', '.ml', '.ga', '.cf', '.gq', '.xyz', '.top', '.work',
             '.click', '.link', '.download', '.racing', '.win'
@@ -40,7 +146,11 @@ class AdvancedFeatureExtractor:
         self.trusted_tlds = [
             '.com', '.org', '.net', '.edu', '.gov', '.mil'
         ]
-        
+
+        # Frozensets of bare suffixes for O(1) TLD classification
+        self._trusted_tld_set = frozenset(t.lstrip('.') for t in self.trusted_tlds)
+        self._suspicious_tld_set = frozenset(t.lstrip('.') for t in self.suspicious_tlds)
+
         self.feature_names = [
             # Lexical features (8)
             'url_length',
@@ -69,28 +179,33 @@ class AdvancedFeatureExtractor:
             'query_length'
         ]
     
-    def extract_features(self, url: str) -> np.ndarray:
+    def extract_features(self, url: str, out: np.ndarray = None) -> np.ndarray:
         """
         Extract all 20 features from URL
-        
+
         Args:
             url (str): URL to analyze
-            
+            out (np.ndarray): Optional preallocated float32 vector of
+                shape (20,) to fill in place (e.g. a batch matrix row)
+
         Returns:
             np.ndarray: Feature vector of shape (20,)
         """
-        features = []
-        
-        # Lexical features
-        features.extend(self._extract_lexical_features(url))
-        
-        # Statistical features
-        features.extend(self._extract_statistical_features(url))
-        
-        # Domain-based features
-        features.extend(self._extract_domain_features(url))
-        
-        return np.array(features, dtype=np.float32)
+        if out is None:
+            out = np.empty(len(self.feature_names), dtype=np.float32)
+
+        # uint8 view of the URL bytes; one bincount histogram over it
+        # replaces the per-character tallies
+        url_bytes = np.frombuffer(url.encode('utf-8'), dtype=np.uint8)
+        byte_counts = np.bincount(url_bytes, minlength=256)
+
+        # Each group writes its slice of the output vector in place, so no
+        # intermediate list of boxed Python scalars is built
+        self._extract_lexical_features(url, byte_counts, out)
+        self._extract_statistical_features(url, url_bytes, byte_counts, out)
+        self._extract_domain_features(url, out)
+
+        return out
     
     def extract_features_dict(self, url: str) -> dict:
         """
@@ -104,198 +219,199 @@ class AdvancedFeatureExtractor:
         """
         features = self.extract_features(url)
         return dict(zip(self.feature_names, features.tolist()))
-    
-    def _extract_lexical_features(self, url: str) -> list:
-        """Extract 8 lexical features"""
-        features = []
-        
+
+    def extract_features_batch(self, urls: list) -> np.ndarray:
+        """
+        Extract features from multiple URLs in one call
+
+        Fills a preallocated (N, 20) float32 matrix row by row so callers
+        can run scaler.transform / predict_proba once over the whole batch
+        instead of once per URL
+
+        Args:
+            urls (list): URLs to analyze
+
+        Returns:
+            np.ndarray: Feature matrix of shape (len(urls), 20)
+        """
+        out = np.empty((len(urls), len(self.feature_names)), dtype=np.float32)
+
+        for i, url in enumerate(urls):
+            self.extract_features(url, out[i])
+
+        return out
+
+    def _extract_lexical_features(self, url: str, byte_counts: np.ndarray,
+                                  out: np.ndarray) -> None:
+        """Extract 8 lexical features into out[0:8]"""
         # 1. URL length
-        features.append(len(url))
-        
+        out[0] = len(url)
+
         # 2. Number of dots
-        features.append(url.count('.'))
-        
+        out[1] = byte_counts[ord('.')]
+
         # 3. Number of slashes
-        features.append(url.count('/'))
-        
+        out[2] = byte_counts[ord('/')]
+
         # 4. Number of hyphens
-        features.append(url.count('-'))
-        
+        out[3] = byte_counts[ord('-')]
+
         # 5. Number of digits
-        features.append(sum(c.isdigit() for c in url))
-        
+        out[4] = byte_counts[ord('0'):ord('9') + 1].sum()
+
         # 6. Has IP address (binary)
-        has_ip = 1 if self._has_ip_address(url) else 0
-        features.append(has_ip)
-        
-        # 7. Suspicious keyword count
+        out[5] = 1 if self._has_ip_address(url) else 0
+
+        # 7. Suspicious keyword count (each keyword counted once)
         url_lower = url.lower()
-        keyword_count = sum(1 for keyword in self.suspicious_keywords if keyword in url_lower)
-        features.append(keyword_count)
-        
+        if self._keyword_automaton is not None and len(url_lower) >= 80:
+            # Single automaton pass amortizes best on long URLs
+            matched = {keyword for _, keyword in self._keyword_automaton.iter(url_lower)}
+        else:
+            matched = set(self._keyword_re.findall(url_lower))
+        out[6] = len(matched)
+
         # 8. Uses HTTPS (binary)
-        uses_https = 1 if url.startswith('https://') else 0
-        features.append(uses_https)
-        
-        return features
-    
-    def _extract_statistical_features(self, url: str) -> list:
-        """Extract 5 statistical features"""
-        features = []
-        
+        out[7] = 1 if url.startswith('https://') else 0
+
+    def _extract_statistical_features(self, url: str, url_bytes: np.ndarray,
+                                      byte_counts: np.ndarray,
+                                      out: np.ndarray) -> None:
+        """Extract 5 statistical features into out[8:13]"""
         # 1. Shannon entropy
-        features.append(self._calculate_shannon_entropy(url))
-        
+        out[8] = self._calculate_shannon_entropy(url, url_bytes)
+
         # 2. Vowel to consonant ratio
-        features.append(self._vowel_consonant_ratio(url))
-        
+        out[9] = self._vowel_consonant_ratio(byte_counts)
+
         # 3. Digit to letter ratio
-        features.append(self._digit_letter_ratio(url))
-        
+        out[10] = self._digit_letter_ratio(byte_counts)
+
         # 4. Special character ratio
-        features.append(self._special_char_ratio(url))
-        
+        out[11] = self._special_char_ratio(byte_counts, url_bytes.size)
+
         # 5. URL randomness score
-        features.append(self._url_randomness_score(url))
-        
-        return features
-    
-    def _extract_domain_features(self, url: str) -> list:
-        """Extract 7 domain-based features"""
-        features = []
-        
+        out[12] = self._url_randomness_score(url, url_bytes)
+
+    def _extract_domain_features(self, url: str, out: np.ndarray) -> None:
+        """Extract 7 domain-based features into out[13:20]"""
         try:
-            parsed = urlparse(url)
-            extracted = tldextract.extract(url)
-            
+            _, host, path, query = _fast_split(url)
+            extracted = _extract_host_parts(host.lower())
+
             domain = extracted.domain
             subdomain = extracted.subdomain
-            
+
             # 1. Domain length
-            features.append(len(domain))
-            
+            out[13] = len(domain)
+
             # 2. Number of subdomains
-            num_subdomains = len(subdomain.split('.')) if subdomain else 0
-            features.append(num_subdomains)
-            
+            out[14] = len(subdomain.split('.')) if subdomain else 0
+
             # 3. TLD category (0=trusted, 1=neutral, 2=suspicious)
-            tld = f".{extracted.suffix}"
-            if tld in self.trusted_tlds:
+            # tldextract already resolved the public suffix, so set
+            # membership replaces the per-TLD endswith walk
+            suffix = extracted.suffix
+            if suffix in self._trusted_tld_set:
                 tld_category = 0
-            elif any(tld.endswith(sus) for sus in self.suspicious_tlds):
+            elif suffix.rsplit('.', 1)[-1] in self._suspicious_tld_set:
                 tld_category = 2
             else:
                 tld_category = 1
-            features.append(tld_category)
-            
-            # 4. Domain has digits (binary)
-            domain_has_digits = 1 if any(c.isdigit() for c in domain) else 0
-            features.append(domain_has_digits)
-            
+            out[15] = tld_category
+
+            # 4. Domain has digits (binary) - one C-level translate pass
+            # instead of a per-character isdigit() loop
+            out[16] = 1 if len(domain) != len(domain.translate(_DIGIT_REMOVER)) else 0
+
             # 5. Domain entropy
-            features.append(self._calculate_shannon_entropy(domain))
-            
+            out[17] = self._calculate_shannon_entropy(domain)
+
             # 6. Path length
-            path_length = len(parsed.path) if parsed.path else 0
-            features.append(path_length)
-            
+            out[18] = len(path)
+
             # 7. Query length
-            query_length = len(parsed.query) if parsed.query else 0
-            features.append(query_length)
-            
+            out[19] = len(query)
+
         except Exception as e:
             # If parsing fails, return default values
-            features = [0] * 7
-        
-        return features
+            out[13:20] = 0
     
     def _has_ip_address(self, url: str) -> bool:
-        """Check if URL contains an IP address"""
-        # IPv4 pattern
-        ipv4_pattern = r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}'
-        return bool(re.search(ipv4_pattern, url))
+        """Check if the URL host is an IP address"""
+        # An IP only ever appears in the authority, so anchor the match on
+        # the host instead of scanning the whole URL (query included)
+        _, host, _, _ = _fast_split(url)
+        return bool(_IPV4_RE.match(host))
     
-    def _calculate_shannon_entropy(self, text: str) -> float:
+    def _calculate_shannon_entropy(self, text: str, text_bytes: np.ndarray = None) -> float:
         """Calculate Shannon entropy of text"""
         if not text:
             return 0.0
-        
-        # Count character frequencies
-        counter = Counter(text)
-        length = len(text)
-        
-        # Calculate entropy
-        entropy = 0.0
-        for count in counter.values():
-            probability = count / length
-            if probability > 0:
-                entropy -= probability * math.log2(probability)
-        
-        return entropy
-    
-    def _vowel_consonant_ratio(self, url: str) -> float:
+
+        # Reuse the shared uint8 buffer when the caller already built one
+        if text_bytes is None:
+            text_bytes = np.frombuffer(text.encode('utf-8'), dtype=np.uint8)
+
+        return float(shannon_entropy_u8(text_bytes))
+
+    def _vowel_consonant_ratio(self, byte_counts: np.ndarray) -> float:
         """Calculate vowel to consonant ratio"""
-        vowels = 'aeiouAEIOU'
-        consonants = 'bcdfghjklmnpqrstvwxyzBCDFGHJKLMNPQRSTVWXYZ'
-        
-        vowel_count = sum(1 for c in url if c in vowels)
-        consonant_count = sum(1 for c in url if c in consonants)
-        
+        # Class totals come from the shared 256-bin histogram, so the
+        # cost is fixed regardless of URL length
+        vowel_count = int(byte_counts.dot(_VOWEL_LUT))
+        consonant_count = int(byte_counts.dot(_CONSONANT_LUT))
+
         if consonant_count == 0:
             return 0.0
-        
+
         return vowel_count / consonant_count
-    
-    def _digit_letter_ratio(self, url: str) -> float:
+
+    def _digit_letter_ratio(self, byte_counts: np.ndarray) -> float:
         """Calculate digit to letter ratio"""
-        digits = sum(1 for c in url if c.isdigit())
-        letters = sum(1 for c in url if c.isalpha())
-        
+        digits = int(byte_counts.dot(_DIGIT_LUT))
+        letters = int(byte_counts.dot(_LETTER_LUT))
+
         if letters == 0:
             return 0.0
-        
+
         return digits / letters
-    
-    def _special_char_ratio(self, url: str) -> float:
+
+    def _special_char_ratio(self, byte_counts: np.ndarray, length: int) -> float:
         """Calculate ratio of special characters"""
-        special_chars = sum(1 for c in url if not c.isalnum())
-        
-        if len(url) == 0:
+        if length == 0:
             return 0.0
-        
-        return special_chars / len(url)
+
+        special_chars = length - int(byte_counts.dot(_ALNUM_LUT))
+
+        return special_chars / length
     
-    def _url_randomness_score(self, url: str) -> float:
+    def _url_randomness_score(self, url: str, url_bytes: np.ndarray = None) -> float:
         """
         Calculate URL randomness score
         Higher score = more random (potentially suspicious)
         """
-        # Extract alphanumeric characters
-        alphanum = ''.join(c for c in url if c.isalnum())
-        
-        if len(alphanum) < 2:
-            return 0.0
-        
-        # Calculate consecutive character changes
-        changes = sum(1 for i in range(len(alphanum) - 1) 
-                     if alphanum[i] != alphanum[i + 1])
-        
-        # Normalize by length
-        randomness = changes / (len(alphanum) - 1)
-        
-        return randomness
+        if url_bytes is None:
+            url_bytes = np.frombuffer(url.encode('utf-8'), dtype=np.uint8)
+
+        # Fraction of consecutive alphanumeric characters that differ
+        return float(url_randomness_u8(url_bytes))
     
     def get_feature_names(self) -> list:
         """Return list of feature names"""
         return self.feature_names
-    
-    def extract_features_dict(self, url: str) -> dict:
-        """
-        Extract features and return as dictionary
-        Useful for debugging and explanation
-        """
-        features = self.extract_features(url)
-        return dict(zip(self.feature_names, features))
+
+
+@lru_cache(maxsize=1)
+def get_extractor() -> AdvancedFeatureExtractor:
+    """
+    Shared AdvancedFeatureExtractor instance
+
+    The extractor builds its keyword automaton and TLD sets at
+    construction, so request handlers should use this singleton instead
+    of instantiating a fresh extractor per call
+    """
+    return AdvancedFeatureExtractor()
 
 
 # Test the extractor
@@ -3,18 +3,22 @@ Authentication utilities - password hashing and JWT tokens
 """
 from datetime import datetime, timedelta
 from typing import Optional
+import hashlib
 import os
+import time
 
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from .database import get_db, User
 
 # Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pin the bcrypt work factor so hashing cost is deterministic across deployments
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
 
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-super-secret-key-change-in-production-phishguard-2024")
@@ -24,6 +28,23 @@ ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
 
+# In-process cache of token -> user so hot endpoints don't pay a JWT decode
+# plus DB round-trip on every authenticated request. Entries expire after a
+# short TTL; logout and account changes clear the cache explicitly.
+_USER_CACHE_TTL = 60  # seconds
+_USER_CACHE_MAX = 4096
+_user_cache = {}
+
+
+def _token_cache_key(token: str) -> bytes:
+    """Fixed-size cache key so raw tokens are not kept in memory"""
+    return hashlib.blake2s(token.encode(), digest_size=16).digest()
+
+
+def invalidate_user_cache() -> None:
+    """Drop all cached token lookups (called on logout and account changes)"""
+    _user_cache.clear()
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
@@ -62,19 +83,43 @@ async def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
-    """Get current authenticated user from JWT token"""
+    """
+    Get current authenticated user from JWT token
+
+    Returns a lightweight read-only row (attribute access matches the
+    User columns) instead of a full ORM instance - endpoints that mutate
+    the account re-fetch the ORM object by primary key
+    """
     if not token:
         return None
-    
+
+    cache_key = _token_cache_key(token)
+    now = time.monotonic()
+    cached = _user_cache.get(cache_key)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
     payload = decode_token(token)
     if payload is None:
         return None
-    
+
     user_id = payload.get("user_id")
     if user_id is None:
         return None
-    
-    user = db.query(User).filter(User.id == user_id).first()
+
+    user = db.execute(
+        select(
+            User.id, User.email, User.full_name, User.is_active,
+            User.is_verified, User.subscribe_newsletter, User.created_at,
+            User.last_login, User.total_scans, User.phishing_detected,
+        ).where(User.id == user_id)
+    ).first()
+
+    if user is not None:
+        if len(_user_cache) >= _USER_CACHE_MAX:
+            _user_cache.clear()
+        _user_cache[cache_key] = (now + _USER_CACHE_TTL, user)
+
     return user
 
 
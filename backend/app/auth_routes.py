@@ -2,17 +2,19 @@
 Authentication API endpoints
 """
 from datetime import datetime, timedelta
+from typing import Union
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
-from .database import get_db, User, init_db
+from .database import get_db, User
 from .schemas import (
     UserCreate, UserLogin, UserResponse, UserProfileUpdate,
-    LoginResponse, RegisterResponse, AuthResponse
+    LoginResponse, LoginResponseLite, RegisterResponse, AuthResponse
 )
 from .auth import (
     get_password_hash, authenticate_user, create_access_token,
-    get_current_user, get_current_active_user, ACCESS_TOKEN_EXPIRE_MINUTES
+    get_current_user, get_current_active_user, invalidate_user_cache,
+    ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
@@ -56,14 +58,18 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     return RegisterResponse(
         success=True,
         message="Account created successfully! Please check your email to verify your account.",
-        user=UserResponse.model_validate(new_user)
+        user=UserResponse.from_orm_fast(new_user)
     )
 
 
-@router.post("/login", response_model=LoginResponse)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", response_model=Union[LoginResponse, LoginResponseLite])
+async def login(credentials: UserLogin, full: bool = True,
+                db: Session = Depends(get_db)):
     """
     Authenticate user and return JWT token.
+
+    Pass ?full=0 for a slim response (token + user id) that skips
+    serializing the profile payload.
     """
     user = authenticate_user(db, credentials.email, credentials.password)
     
@@ -94,19 +100,28 @@ async def login(credentials: UserLogin, db: Session = Depends(get_db)):
         expires_delta=token_expires
     )
     
+    if not full:
+        return LoginResponseLite(
+            success=True,
+            message="Login successful",
+            access_token=access_token,
+            token_type="bearer",
+            user_id=user.id
+        )
+
     return LoginResponse(
         success=True,
         message="Login successful",
         access_token=access_token,
         token_type="bearer",
-        user=UserResponse.model_validate(user)
+        user=UserResponse.from_orm_fast(user)
     )
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(current_user: User = Depends(get_current_active_user)):
     """Get current authenticated user's profile."""
-    return UserResponse.model_validate(current_user)
+    return UserResponse.from_orm_fast(current_user)
 
 
 @router.put("/me", response_model=UserResponse)
@@ -116,17 +131,23 @@ async def update_profile(
     db: Session = Depends(get_db)
 ):
     """Update current user's profile."""
+    # get_current_user serves a read-only row; load the ORM object to mutate
+    user = db.get(User, current_user.id)
+
     if profile_update.full_name is not None:
-        current_user.full_name = profile_update.full_name
-    
+        user.full_name = profile_update.full_name
+
     if profile_update.subscribe_newsletter is not None:
-        current_user.subscribe_newsletter = profile_update.subscribe_newsletter
-    
-    current_user.updated_at = datetime.utcnow()
+        user.subscribe_newsletter = profile_update.subscribe_newsletter
+
+    user.updated_at = datetime.utcnow()
     db.commit()
-    db.refresh(current_user)
-    
-    return UserResponse.model_validate(current_user)
+    db.refresh(user)
+
+    # Drop cached token lookups so the updated profile is served immediately
+    invalidate_user_cache()
+
+    return UserResponse.from_orm_fast(user)
 
 
 @router.post("/logout", response_model=AuthResponse)
@@ -135,6 +156,8 @@ async def logout(current_user: User = Depends(get_current_active_user)):
     Logout user (client should discard the token).
     Server-side logout would require token blacklisting.
     """
+    invalidate_user_cache()
+
     return AuthResponse(
         success=True,
         message="Logged out successfully"
@@ -147,9 +170,12 @@ async def delete_account(
     db: Session = Depends(get_db)
 ):
     """Delete current user's account."""
-    db.delete(current_user)
+    user = db.get(User, current_user.id)
+    db.delete(user)
     db.commit()
-    
+
+    invalidate_user_cache()
+
     return AuthResponse(
         success=True,
         message="Account deleted successfully"
@@ -166,7 +192,3 @@ async def get_user_stats(current_user: User = Depends(get_current_active_user)):
         "account_created": current_user.created_at.isoformat() if current_user.created_at else None,
         "last_login": current_user.last_login.isoformat() if current_user.last_login else None
     }
-
-
-# Initialize database on module load
-init_db()
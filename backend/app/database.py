@@ -1,9 +1,9 @@
 """
 Database configuration and models for user authentication
 """
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import create_engine, event, insert, Column, Integer, String, Boolean, DateTime, Text, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 from datetime import datetime
 import os
 
@@ -17,6 +17,14 @@ if DATABASE_URL.startswith("postgres://"):
 # Create engine
 if DATABASE_URL.startswith("sqlite"):
     engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragma(dbapi_connection, connection_record):
+        """Enable WAL so readers are not blocked by scan-history writes"""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
 else:
     engine = create_engine(DATABASE_URL)
 
@@ -70,11 +78,32 @@ class ScanHistory(Base):
     
     # Timestamps
     scanned_at = Column(DateTime, default=datetime.utcnow)
-    
+
+    # Composite index so listing a user's history newest-first does not
+    # need a filesort
+    __table_args__ = (
+        Index('ix_scan_user_time', 'user_id', scanned_at.desc()),
+    )
+
     def __repr__(self):
         return f"<ScanHistory {self.url[:30]}... - {self.prediction}>"
 
 
+def bulk_record_scans(db: Session, rows: list):
+    """
+    Insert multiple scan history rows in one statement
+
+    Args:
+        db (Session): Database session
+        rows (list): List of dicts matching ScanHistory columns
+    """
+    if not rows:
+        return
+
+    db.execute(insert(ScanHistory), rows)
+    db.commit()
+
+
 # Dependency to get database session
 def get_db():
     """Dependency that provides a database session"""
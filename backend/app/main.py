@@ -8,12 +8,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, HttpUrl
 from typing import Dict, List, Optional
 import pickle
+import joblib
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
 import json
+import time
 from datetime import datetime
-from .advanced_feature_extractor import AdvancedFeatureExtractor
+from .advanced_feature_extractor import get_extractor
 from .auth_routes import router as auth_router
+from .database import init_db
+
+try:
+    # Optional: compiled-graph inference without per-call Python dispatch
+    import onnxruntime as ort
+except ImportError:
+    ort = None
 
 
 app = FastAPI(
@@ -35,10 +45,105 @@ app.add_middleware(
 app.include_router(auth_router)
 
 
+@app.on_event("startup")
+async def create_db_tables():
+    """Create database tables once the server starts, not at import time"""
+    init_db()
+
+
+# Representative URL shapes (short/long, query-heavy, IP host) so the
+# first real request doesn't pay model and allocator warmup cost
+_WARMUP_URLS = [
+    "http://example.com",
+    "https://www.google.com/search?q=test",
+    "http://192.168.1.1/admin/login.php",
+    "https://secure-login.account-verify.example.tk/signin?user=a&session=b1c2d3",
+    "https://a.b.c.example.com/" + "x" * 80,
+]
+
+
+@app.on_event("startup")
+async def warm_up_predictor():
+    """Run dummy predictions at startup to absorb first-call latency"""
+    for url in _WARMUP_URLS:
+        predictor.predict(url)
+    predictor.predict_batch(_WARMUP_URLS)
+
+
+# Indicator payloads hoisted to module scope so /explain reuses interned
+# dicts instead of rebuilding identical literals per request; entries
+# whose value depends on the URL are shallow-copied with it overridden
+_INDICATOR_TEMPLATES = {
+    "ip": {
+        "feature": "IP Address in URL",
+        "value": "Present",
+        "severity": "high",
+        "description": "URLs with IP addresses are often used in phishing attacks"
+    },
+    "keywords": {
+        "feature": "Suspicious Keywords",
+        "value": "",
+        "severity": "high",
+        "description": "Multiple suspicious keywords detected (login, verify, secure, etc.)"
+    },
+    "no_https": {
+        "feature": "No HTTPS",
+        "value": "HTTP only",
+        "severity": "medium",
+        "description": "Legitimate sites typically use HTTPS for security"
+    },
+    "long_url": {
+        "feature": "Long URL",
+        "value": "",
+        "severity": "medium",
+        "description": "Unusually long URLs are common in phishing attempts"
+    },
+    "entropy": {
+        "feature": "High Entropy",
+        "value": "",
+        "severity": "medium",
+        "description": "Random-looking URL structure suggests obfuscation"
+    },
+    "https": {
+        "feature": "HTTPS Enabled",
+        "value": "Secure",
+        "severity": "positive",
+        "description": "Site uses secure HTTPS protocol"
+    },
+    "trusted_tld": {
+        "feature": "Trusted TLD",
+        "value": "Verified",
+        "severity": "positive",
+        "description": "Uses trusted top-level domain (.com, .org, .net)"
+    },
+    "no_keywords": {
+        "feature": "No Suspicious Keywords",
+        "value": "Clean",
+        "severity": "positive",
+        "description": "URL does not contain common phishing keywords"
+    },
+}
+
+
+@lru_cache(maxsize=1)
+def _iso_second(epoch_s: int) -> str:
+    """ISO-8601 timestamp for a whole epoch second"""
+    return datetime.fromtimestamp(epoch_s).isoformat()
+
+
+def _iso_now() -> str:
+    """Current ISO timestamp, formatted at most once per wall-clock second"""
+    return _iso_second(int(time.time()))
+
+
 class URLRequest(BaseModel):
     url: str
 
 
+class URLBatchRequest(BaseModel):
+    urls: List[str]
+
+
 class PredictionResponse(BaseModel):
     url: str
     prediction: str
@@ -77,9 +182,14 @@ class EnhancedPredictor:
     def __init__(self):
         self.model = None
         self.scaler = None
-        self.feature_extractor = AdvancedFeatureExtractor()
+        self.session = None
+        self.feature_extractor = get_extractor()
         self.model_info = {}
         self.load_model()
+
+        # Repeated scans of the same URL (retries, dashboards) skip
+        # feature extraction and model inference entirely
+        self._predict_raw = lru_cache(maxsize=4096)(self._predict_raw_uncached)
     
     def load_model(self):
         """Load trained model and metadata"""
@@ -89,15 +199,48 @@ class EnhancedPredictor:
             if not model_path.exists():
                 model_path = Path("backend/models/phishing_model.pkl")
             
-            with open(model_path, 'rb') as f:
-                self.model = pickle.load(f)
-            
+            # Prefer the uncompressed joblib dump: mmap_mode keeps the
+            # tree arrays on disk, paged in on demand and shared
+            # read-only across worker processes
+            joblib_path = model_path.with_suffix('.joblib')
+            if joblib_path.exists():
+                self.model = joblib.load(joblib_path, mmap_mode='r')
+            else:
+                with open(model_path, 'rb') as f:
+                    self.model = pickle.load(f)
+
+            # Prefer an exported ONNX graph when one is shipped next to the
+            # pickle and onnxruntime is installed; the pickled model stays
+            # loaded as the fallback path
+            onnx_path = model_path.with_suffix('.onnx')
+            if ort is not None and onnx_path.exists():
+                options = ort.SessionOptions()
+                options.intra_op_num_threads = 1  # latency over throughput
+                self.session = ort.InferenceSession(
+                    str(onnx_path),
+                    sess_options=options,
+                    providers=['CPUExecutionProvider']
+                )
+                self._onnx_input = self.session.get_inputs()[0].name
+                print(f"✅ ONNX session loaded from {onnx_path}")
+
             # Load scaler
+            scaler_joblib = model_path.parent / "scaler.joblib"
             scaler_path = model_path.parent / "scaler.pkl"
-            if scaler_path.exists():
+            if scaler_joblib.exists():
+                self.scaler = joblib.load(scaler_joblib, mmap_mode='r')
+            elif scaler_path.exists():
                 with open(scaler_path, 'rb') as f:
                     self.scaler = pickle.load(f)
-            
+
+            if self.scaler is not None:
+                # Cached affine params and a reusable row buffer let
+                # single-row requests scale inline, skipping sklearn's
+                # validation pass and two allocations per call
+                self._scaler_mean = self.scaler.mean_.astype(np.float32)
+                self._scaler_scale = self.scaler.scale_.astype(np.float32)
+                self._row_buf = np.empty((1, self._scaler_mean.size), dtype=np.float32)
+
             # Load model info
             info_path = model_path.parent / "model_comparison.json"
             if info_path.exists():
@@ -110,34 +253,60 @@ class EnhancedPredictor:
             print(f"❌ Error loading model: {str(e)}")
             raise
     
+    def _onnx_proba(self, features: np.ndarray) -> np.ndarray:
+        """Phishing probabilities from the ONNX session for a feature matrix"""
+        raw = self.session.run(
+            None, {self._onnx_input: features.astype(np.float32, copy=False)}
+        )[1]
+
+        # Converters emit either an (n, 2) probability matrix or, with
+        # zipmap enabled, a list of {class: probability} dicts
+        if isinstance(raw[0], dict):
+            return np.array([row.get(1, row.get('1', 0.0)) for row in raw])
+        return np.asarray(raw)[:, 1]
+
+    def _predict_raw_uncached(self, url: str) -> tuple:
+        """Run feature extraction and model inference for a URL"""
+        return self._predict_from_vector(self.feature_extractor.extract_features(url))
+
+    def _predict_from_vector(self, vector: np.ndarray) -> tuple:
+        """Scale and run model inference on an already-extracted vector"""
+        features = vector.reshape(1, -1)
+
+        # Scale if scaler available - the transform is just an affine
+        # map, applied inline into the preallocated row buffer
+        if self.scaler:
+            np.subtract(features, self._scaler_mean, out=self._row_buf)
+            np.divide(self._row_buf, self._scaler_scale, out=self._row_buf)
+            features = self._row_buf
+
+        # Get prediction - prefer the ONNX session, then handle both
+        # sklearn and LightGBM pickles
+        if self.session is not None:
+            probability = float(self._onnx_proba(features)[0])
+            prediction = 1 if probability >= 0.5 else 0
+        elif hasattr(self.model, 'predict_proba'):
+            # Sklearn models (LogisticRegression, RandomForest, LGBMClassifier)
+            prediction = self.model.predict(features)[0]
+            probability = self.model.predict_proba(features)[0][1]  # Probability of phishing (class 1)
+        else:
+            # LightGBM Booster - returns probability of legitimate (class 0)
+            # Higher value = more legitimate, Lower value = more phishing
+            raw_score = float(self.model.predict(features)[0])
+
+            # The model outputs probability of being LEGITIMATE
+            # So probability of phishing = 1 - raw_score
+            # BUT if raw_score > 0.5, it's legitimate
+            probability = 1.0 - raw_score  # Probability of phishing
+            prediction = 1 if probability >= 0.5 else 0
+
+        return int(prediction), float(probability)
+
     def predict(self, url: str) -> Dict:
         """Predict with basic response"""
         try:
-            # Extract features
-            features = self.feature_extractor.extract_features(url)
-            features = features.reshape(1, -1)
-            
-            
-            # Scale if scaler available
-            if self.scaler:
-                features = self.scaler.transform(features)
-            
-            # Get prediction - handle both sklearn and LightGBM models
-            if hasattr(self.model, 'predict_proba'):
-                # Sklearn models (LogisticRegression, RandomForest, LGBMClassifier)
-                prediction = self.model.predict(features)[0]
-                probability = self.model.predict_proba(features)[0][1]  # Probability of phishing (class 1)
-            else:
-                # LightGBM Booster - returns probability of legitimate (class 0)
-                # Higher value = more legitimate, Lower value = more phishing
-                raw_score = float(self.model.predict(features)[0])
-                
-                # The model outputs probability of being LEGITIMATE
-                # So probability of phishing = 1 - raw_score  
-                # BUT if raw_score > 0.5, it's legitimate
-                probability = 1.0 - raw_score  # Probability of phishing
-                prediction = 1 if probability >= 0.5 else 0
-            
+            prediction, probability = self._predict_raw(url)
+
             # Determine labels
             is_phishing = prediction == 1
             prediction_label = "phishing" if is_phishing else "legitimate"
@@ -158,7 +327,7 @@ class EnhancedPredictor:
                 "probability": round(float(probability), 4),
                 "risk_level": risk_level,
                 "is_safe": not is_phishing,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
         
         except Exception as e:
@@ -170,28 +339,74 @@ class EnhancedPredictor:
                 "risk_level": "unknown",
                 "is_safe": False,
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _iso_now()
             }
     
+    def predict_batch(self, urls: List[str]) -> List[Dict]:
+        """Predict many URLs with one feature pass and one model call"""
+        features = self.feature_extractor.extract_features_batch(urls)
+
+        if self.scaler:
+            features = self.scaler.transform(features).astype(np.float32, copy=False)
+
+        # One inference call over the whole matrix instead of one per URL
+        if self.session is not None:
+            probabilities = self._onnx_proba(features)
+        elif hasattr(self.model, 'predict_proba'):
+            probabilities = self.model.predict_proba(features)[:, 1]
+        else:
+            # LightGBM Booster outputs probability of legitimate (class 0)
+            probabilities = 1.0 - np.asarray(self.model.predict(features))
+
+        predictions = probabilities >= 0.5
+        confidences = np.where(predictions, probabilities, 1.0 - probabilities)
+        risk_levels = np.select(
+            [probabilities < 0.3, probabilities < 0.7],
+            ["low", "medium"],
+            default="high"
+        )
+
+        timestamp = _iso_now()
+        return [
+            {
+                "url": url,
+                "prediction": "phishing" if predictions[i] else "legitimate",
+                "confidence": round(float(confidences[i]), 4),
+                "probability": round(float(probabilities[i]), 4),
+                "risk_level": str(risk_levels[i]),
+                "is_safe": not bool(predictions[i]),
+                "timestamp": timestamp
+            }
+            for i, url in enumerate(urls)
+        ]
+
     def explain(self, url: str) -> Dict:
         """Predict with detailed feature explanation"""
         try:
-            # Get basic prediction
-            prediction_result = self.predict(url)
-            
-            # Extract features as dict
-            features_dict = self.feature_extractor.extract_features_dict(url)
-            
+            # One extraction pass feeds both the model and the explanation
+            vector = self.feature_extractor.extract_features(url)
+            features_dict = dict(zip(
+                self.feature_extractor.get_feature_names(), vector.tolist()
+            ))
+
+            prediction, probability = self._predict_from_vector(vector)
+            is_phishing = prediction == 1
+            prediction_label = "phishing" if is_phishing else "legitimate"
+            confidence = round(float(probability if is_phishing else 1 - probability), 4)
+
             # Get feature importance (if available)
-            top_indicators = self._get_top_indicators(features_dict, prediction_result['prediction'])
-            
+            top_indicators = self._get_top_indicators(features_dict, prediction_label)
+
             # Generate explanation
-            explanation = self._generate_explanation(features_dict, prediction_result)
-            
+            explanation = self._generate_explanation(
+                features_dict,
+                {"prediction": prediction_label, "confidence": confidence}
+            )
+
             return {
                 "url": url,
-                "prediction": prediction_result['prediction'],
-                "confidence": prediction_result['confidence'],
+                "prediction": prediction_label,
+                "confidence": confidence,
                 "features": features_dict,
                 "top_indicators": top_indicators,
                 "explanation": explanation
@@ -208,78 +423,36 @@ class EnhancedPredictor:
             }
     
     def _get_top_indicators(self, features: Dict, prediction: str) -> List[Dict]:
-        """Get top suspicious/safe indicators"""
-        indicators = []
-        
+        """Get top suspicious/safe indicators (at most 5)"""
         if prediction == "phishing":
-            # Phishing indicators
-            if features.get('has_ip_address', 0) == 1:
-                indicators.append({
-                    "feature": "IP Address in URL",
-                    "value": "Present",
-                    "severity": "high",
-                    "description": "URLs with IP addresses are often used in phishing attacks"
-                })
-            
-            if features.get('suspicious_keyword_count', 0) >= 2:
-                indicators.append({
-                    "feature": "Suspicious Keywords",
-                    "value": str(int(features['suspicious_keyword_count'])),
-                    "severity": "high",
-                    "description": "Multiple suspicious keywords detected (login, verify, secure, etc.)"
-                })
-            
-            if features.get('uses_https', 0) == 0:
-                indicators.append({
-                    "feature": "No HTTPS",
-                    "value": "HTTP only",
-                    "severity": "medium",
-                    "description": "Legitimate sites typically use HTTPS for security"
-                })
-            
-            if features.get('url_length', 0) > 75:
-                indicators.append({
-                    "feature": "Long URL",
-                    "value": str(int(features['url_length'])),
-                    "severity": "medium",
-                    "description": "Unusually long URLs are common in phishing attempts"
-                })
-            
-            if features.get('shannon_entropy', 0) > 4.5:
-                indicators.append({
-                    "feature": "High Entropy",
-                    "value": str(round(features['shannon_entropy'], 2)),
-                    "severity": "medium",
-                    "description": "Random-looking URL structure suggests obfuscation"
-                })
-        
+            checks = [
+                ("ip", features.get('has_ip_address', 0) == 1, None),
+                ("keywords", features.get('suspicious_keyword_count', 0) >= 2,
+                 str(int(features.get('suspicious_keyword_count', 0)))),
+                ("no_https", features.get('uses_https', 0) == 0, None),
+                ("long_url", features.get('url_length', 0) > 75,
+                 str(int(features.get('url_length', 0)))),
+                ("entropy", features.get('shannon_entropy', 0) > 4.5,
+                 str(round(features.get('shannon_entropy', 0), 2))),
+            ]
         else:
-            # Legitimate indicators
-            if features.get('uses_https', 0) == 1:
-                indicators.append({
-                    "feature": "HTTPS Enabled",
-                    "value": "Secure",
-                    "severity": "positive",
-                    "description": "Site uses secure HTTPS protocol"
-                })
-            
-            if features.get('tld_category', 0) == 0:
-                indicators.append({
-                    "feature": "Trusted TLD",
-                    "value": "Verified",
-                    "severity": "positive",
-                    "description": "Uses trusted top-level domain (.com, .org, .net)"
-                })
-            
-            if features.get('suspicious_keyword_count', 0) == 0:
-                indicators.append({
-                    "feature": "No Suspicious Keywords",
-                    "value": "Clean",
-                    "severity": "positive",
-                    "description": "URL does not contain common phishing keywords"
-                })
-        
-        return indicators[:5]  # Return top 5
+            checks = [
+                ("https", features.get('uses_https', 0) == 1, None),
+                ("trusted_tld", features.get('tld_category', 0) == 0, None),
+                ("no_keywords", features.get('suspicious_keyword_count', 0) == 0, None),
+            ]
+
+        indicators = []
+        for key, condition, value in checks:
+            if condition:
+                template = _INDICATOR_TEMPLATES[key]
+                indicators.append(
+                    template if value is None else {**template, "value": value}
+                )
+                if len(indicators) == 5:
+                    break
+
+        return indicators
     
     def _generate_explanation(self, features: Dict, prediction_result: Dict) -> str:
         """Generate human-readable explanation"""
@@ -368,6 +541,23 @@ async def predict_url(request: URLRequest):
     return result
 
 
+@app.post("/predict_batch", response_model=List[PredictionResponse])
+async def predict_urls_batch(request: URLBatchRequest):
+    """
+    Predict a batch of URLs in one model call
+
+    Returns:
+    - One prediction per URL, in request order
+    """
+    if not request.urls:
+        return []
+
+    try:
+        return predictor.predict_batch(request.urls)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/explain", response_model=ExplanationResponse)
 async def explain_prediction(request: URLRequest):
     """
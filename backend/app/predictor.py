@@ -3,10 +3,46 @@ ML Model Predictor
 Loads trained model and makes predictions
 """
 
-import pickle
+import re
+import joblib
 import numpy as np
+from functools import lru_cache
 from pathlib import Path
-from .features import URLFeatureExtractor
+from .features import URLFeatureExtractor, _fast_split
+
+try:
+    # Optional: memory-bounded membership tests for large blocklist feeds
+    from pybloom_live import BloomFilter
+except ImportError:
+    BloomFilter = None
+
+# Heuristic pattern tables, compiled once at import so each prediction
+# does a handful of regex passes instead of ~30 substring scans
+_PHISHING_KEYWORDS = [
+    'verify', 'account', 'update', 'secure', 'login', 'signin',
+    'banking', 'confirm', 'suspended', 'locked', 'unusual',
+    'activity', 'alert', 'security', 'notification'
+]
+
+# Keywords that make a missing https:// prefix suspicious
+_LOGIN_KEYWORDS = frozenset({'login', 'signin', 'account', 'secure'})
+
+_LEGITIMATE_DOMAINS = [
+    'google.com', 'facebook.com', 'amazon.com', 'paypal.com',
+    'microsoft.com', 'apple.com', 'netflix.com', 'instagram.com',
+    'twitter.com', 'linkedin.com', 'github.com', 'bankofamerica.com',
+    'chase.com', 'wellsfargo.com', 'citibank.com'
+]
+
+# Every regex-detectable heuristic signal folded into one alternation;
+# a single finditer pass over the URL replaces the per-signal scans
+_HEURISTIC_RE = re.compile('|'.join([
+    r'(?P<ip>(?:\d{1,3}\.){3}\d{1,3})',
+    r'(?P<at>@)',
+    r'(?P<tld>\.(?:tk|ml|ga|cf|gq|xyz|top)(?=[/?:]|$))',
+    '(?P<legit>' + '|'.join(re.escape(d) for d in _LEGITIMATE_DOMAINS) + ')',
+    '(?P<kw>' + '|'.join(re.escape(k) for k in _PHISHING_KEYWORDS) + ')',
+]))
 
 
 class PhishingPredictor:
@@ -35,6 +71,11 @@ class PhishingPredictor:
         self.model = None
         self.feature_extractor = URLFeatureExtractor()
         self.load_model()
+        self._known_phish = self._load_known_phish()
+
+        # Repeated lookups of the same URL reuse the combined score
+        # instead of re-running extraction, inference and heuristics
+        self._score_url = lru_cache(maxsize=4096)(self._score_url_uncached)
     
     def load_model(self):
         """Load the trained model from disk"""
@@ -43,22 +84,67 @@ class PhishingPredictor:
             if not model_file.exists():
                 raise FileNotFoundError(f"Model file not found: {self.model_path}")
             
-            with open(self.model_path, 'rb') as f:
-                self.model = pickle.load(f)
-            
+            # joblib reads both the legacy pickle and joblib dumps;
+            # mmap keeps tree arrays on shared read-only pages across
+            # workers instead of a private heap copy per process
+            self.model = joblib.load(self.model_path, mmap_mode='r')
+
             print(f"✅ Model loaded successfully from {self.model_path}")
         
         except Exception as e:
             print(f"❌ Error loading model: {str(e)}")
             raise
     
+    def _load_known_phish(self):
+        """
+        Build a membership structure over a known-phishing URL feed
+
+        Looks for models/known_phish.txt (one URL per line, refreshed out
+        of band from an intel feed). Large feeds go into a Bloom filter
+        when pybloom_live is installed; smaller feeds use an exact
+        frozenset. Returns None when no feed is present.
+        """
+        for path in ("models/known_phish.txt", "backend/models/known_phish.txt"):
+            feed = Path(path)
+            if feed.exists():
+                with open(feed) as f:
+                    urls = [line.strip() for line in f if line.strip()]
+
+                if BloomFilter is not None and len(urls) > 10000:
+                    bloom = BloomFilter(
+                        capacity=max(2 * len(urls), 100000), error_rate=0.001
+                    )
+                    for url in urls:
+                        bloom.add(url)
+                    return bloom
+
+                return frozenset(urls)
+
+        return None
+
+    def _score_url_uncached(self, url: str) -> float:
+        """Combined ML + heuristic phishing probability for a URL"""
+        # Extract features
+        features = self.feature_extractor.extract_features(url)
+        features = features.reshape(1, -1)
+
+        # Get ML model prediction probability
+        ml_probability = self.model.predict(features)[0]
+
+        # Apply rule-based heuristics for better accuracy
+        heuristic_score = self._apply_heuristics(url)
+
+        # Combine ML and heuristics (weighted average)
+        # 60% ML, 40% heuristics
+        return float(0.6 * ml_probability + 0.4 * heuristic_score)
+
     def predict(self, url: str) -> dict:
         """
         Predict if a URL is phishing or legitimate
-        
+
         Args:
             url (str): URL to analyze
-            
+
         Returns:
             dict: Prediction result with label, confidence, and risk level
         """
@@ -66,21 +152,21 @@ class PhishingPredictor:
             # Validate URL
             if not url or not isinstance(url, str):
                 raise ValueError("Invalid URL provided")
-            
-            # Extract features
-            features = self.feature_extractor.extract_features(url)
-            features = features.reshape(1, -1)
-            
-            # Get ML model prediction probability
-            ml_probability = self.model.predict(features)[0]
-            
-            # Apply rule-based heuristics for better accuracy
-            heuristic_score = self._apply_heuristics(url)
-            
-            # Combine ML and heuristics (weighted average)
-            # 60% ML, 40% heuristics
-            probability = 0.6 * ml_probability + 0.4 * heuristic_score
-            
+
+            # Known-bad feed lookup short-circuits extraction, inference
+            # and heuristics for the traffic that revisits known domains
+            if self._known_phish is not None and url in self._known_phish:
+                return {
+                    "url": url,
+                    "prediction": "phishing",
+                    "confidence": 0.99,
+                    "probability": 0.99,
+                    "risk_level": "high",
+                    "is_safe": False
+                }
+
+            probability = self._score_url(url)
+
             # Determine prediction (1 = phishing, 0 = legitimate)
             is_phishing = probability > 0.5
             prediction_label = "phishing" if is_phishing else "legitimate"
@@ -113,70 +199,67 @@ class PhishingPredictor:
         Apply rule-based heuristics to detect phishing
         Returns a score between 0 (legitimate) and 1 (phishing)
         """
-        import re
-        from urllib.parse import urlparse
-        
         score = 0.0
         url_lower = url.lower()
-        
-        # Suspicious keywords in domain
-        phishing_keywords = [
-            'verify', 'account', 'update', 'secure', 'login', 'signin',
-            'banking', 'confirm', 'suspended', 'locked', 'unusual',
-            'activity', 'alert', 'security', 'notification'
-        ]
-        
+
+        # Collect every regex-detectable signal in one pass over the URL
+        keyword_hits = set()
+        has_ip = has_at = suspicious_tld = False
+        legit_domain = None
+        for match in _HEURISTIC_RE.finditer(url_lower):
+            group = match.lastgroup
+            if group == 'kw':
+                keyword_hits.add(match.group())
+            elif group == 'ip':
+                has_ip = True
+            elif group == 'at':
+                has_at = True
+            elif group == 'tld':
+                suspicious_tld = True
+            elif group == 'legit':
+                legit_domain = match.group()
+
         # Check for multiple suspicious keywords
-        keyword_count = sum(1 for keyword in phishing_keywords if keyword in url_lower)
+        keyword_count = len(keyword_hits)
         if keyword_count >= 3:
             score += 0.4
         elif keyword_count >= 2:
             score += 0.25
         elif keyword_count >= 1:
             score += 0.1
-        
+
         # Check for IP address in URL
-        if re.search(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', url):
+        if has_ip:
             score += 0.5
-        
+
         # Check for suspicious TLDs
-        suspicious_tlds = ['.tk', '.ml', '.ga', '.cf', '.gq', '.xyz', '.top']
-        if any(url_lower.endswith(tld) for tld in suspicious_tlds):
+        if suspicious_tld:
             score += 0.3
-        
+
         # Check for @ symbol (often used in phishing)
-        if '@' in url:
+        if has_at:
             score += 0.4
-        
+
         # Check for excessive hyphens in domain
-        parsed = urlparse(url)
-        domain = parsed.netloc
-        if domain.count('-') >= 3:
+        domain, _, _ = _fast_split(url_lower)
+        hyphens = domain.count('-')
+        if hyphens >= 3:
             score += 0.3
-        elif domain.count('-') >= 2:
+        elif hyphens >= 2:
             score += 0.2
-        
+
         # Check for subdomain impersonation (e.g., paypal.com.fake-site.com)
-        legitimate_domains = [
-            'google.com', 'facebook.com', 'amazon.com', 'paypal.com',
-            'microsoft.com', 'apple.com', 'netflix.com', 'instagram.com',
-            'twitter.com', 'linkedin.com', 'github.com', 'bankofamerica.com',
-            'chase.com', 'wellsfargo.com', 'citibank.com'
-        ]
-        
-        for legit_domain in legitimate_domains:
-            if legit_domain in url_lower and not domain.endswith(legit_domain):
-                score += 0.6  # High score for impersonation
-                break
-        
+        if legit_domain and not domain.endswith(legit_domain):
+            score += 0.6  # High score for impersonation
+
         # Check for very long URLs (often phishing)
         if len(url) > 100:
             score += 0.2
-        
+
         # Check for no HTTPS (not always phishing, but suspicious for login pages)
-        if not url.startswith('https://') and any(keyword in url_lower for keyword in ['login', 'signin', 'account', 'secure']):
+        if not url.startswith('https://') and keyword_hits & _LOGIN_KEYWORDS:
             score += 0.2
-        
+
         # Cap the score at 1.0
         return min(score, 1.0)
     
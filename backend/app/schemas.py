@@ -1,10 +1,10 @@
 """
 Pydantic schemas for request/response validation
 """
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, EmailStr, Field, validator
 from typing import Optional
 from datetime import datetime
-import re
+from . import _schemas_fast
 
 
 # ==================== User Schemas ====================
@@ -25,15 +25,7 @@ class UserCreate(UserBase):
     
     @validator('password')
     def validate_password(cls, v):
-        if not re.search(r'[A-Z]', v):
-            raise ValueError('Password must contain at least one uppercase letter')
-        if not re.search(r'[a-z]', v):
-            raise ValueError('Password must contain at least one lowercase letter')
-        if not re.search(r'\d', v):
-            raise ValueError('Password must contain at least one number')
-        if not re.search(r'[!@#$%^&*(),.?":{}|<>]', v):
-            raise ValueError('Password must contain at least one special character')
-        return v
+        return _schemas_fast.validate_password(v)
     
     @validator('confirm_password')
     def passwords_match(cls, v, values):
@@ -55,17 +47,25 @@ class UserCreate(UserBase):
     
     @validator('full_name')
     def validate_name(cls, v):
-        if not re.match(r'^[a-zA-Z\s]+$', v):
-            raise ValueError('Name can only contain letters and spaces')
-        return v.strip()
+        return _schemas_fast.validate_name(v)
 
 
 class UserLogin(BaseModel):
     """Schema for user login"""
-    email: EmailStr
+    email: str
     password: str
     remember_me: bool = False
 
+    @validator('email')
+    def validate_email(cls, v):
+        # Login only needs to match a stored address, so a structural
+        # check replaces the full email-validator/IDNA pass; strict
+        # validation stays on the registration schema
+        v = v.strip().lower()
+        if '@' not in v or '.' not in v.rsplit('@', 1)[1]:
+            raise ValueError('Invalid email address')
+        return v
+
 
 class UserResponse(BaseModel):
     """Schema for user response (without password)"""
@@ -79,9 +79,39 @@ class UserResponse(BaseModel):
     last_login: Optional[datetime]
     total_scans: int
     phishing_detected: int
-    
-    class Config:
-        from_attributes = True
+
+    # Response DTOs are built once and serialized; freezing them and
+    # disabling revalidation lets pydantic-core skip per-field work
+    model_config = ConfigDict(
+        from_attributes=True,
+        extra='ignore',
+        frozen=True,
+        revalidate_instances='never',
+        arbitrary_types_allowed=False,
+    )
+
+    @classmethod
+    def from_orm_fast(cls, user) -> "UserResponse":
+        """
+        Build a response from a trusted DB row without validation
+
+        The fields are already typed by SQLAlchemy, so model_construct
+        skips the per-field validator walk that model_validate runs.
+        Only for rows that came out of the database - untrusted input
+        keeps going through full validation.
+        """
+        return cls.model_construct(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            is_verified=user.is_verified,
+            subscribe_newsletter=user.subscribe_newsletter,
+            created_at=user.created_at,
+            last_login=user.last_login,
+            total_scans=user.total_scans,
+            phishing_detected=user.phishing_detected,
+        )
 
 
 class UserProfileUpdate(BaseModel):
@@ -92,12 +122,23 @@ class UserProfileUpdate(BaseModel):
 
 # ==================== Token Schemas ====================
 
+# Shared config for the pure response wrappers below
+_RESPONSE_CONFIG = ConfigDict(
+    extra='ignore',
+    frozen=True,
+    revalidate_instances='never',
+    arbitrary_types_allowed=False,
+)
+
+
 class Token(BaseModel):
     """JWT token response"""
     access_token: str
     token_type: str = "bearer"
     user: UserResponse
 
+    model_config = _RESPONSE_CONFIG
+
 
 class TokenData(BaseModel):
     """Data encoded in JWT token"""
@@ -113,6 +154,8 @@ class AuthResponse(BaseModel):
     message: str
     data: Optional[dict] = None
 
+    model_config = _RESPONSE_CONFIG
+
 
 class LoginResponse(BaseModel):
     """Login response with token and user data"""
@@ -122,9 +165,32 @@ class LoginResponse(BaseModel):
     token_type: str = "bearer"
     user: UserResponse
 
+    model_config = _RESPONSE_CONFIG
+
+
+class LoginResponseLite(BaseModel):
+    """Slim login response - token and user id only, no profile payload"""
+    success: bool
+    message: str
+    access_token: str
+    token_type: str = "bearer"
+    user_id: int
+
+    model_config = _RESPONSE_CONFIG
+
 
 class RegisterResponse(BaseModel):
     """Registration response"""
     success: bool
     message: str
     user: UserResponse
+
+    model_config = _RESPONSE_CONFIG
+
+
+# Force core-schema construction at import time so process startup pays
+# the pydantic schema-build cost instead of the first login request
+for _model in (UserBase, UserCreate, UserLogin, UserResponse, UserProfileUpdate,
+               Token, TokenData, AuthResponse, LoginResponse, LoginResponseLite,
+               RegisterResponse):
+    _model.model_rebuild()
@@ -2,12 +2,15 @@
 Add more legitimate URLs with complex query strings to improve accuracy
 Then retrain the model
 """
+import os
 import pandas as pd
 import numpy as np
 import pickle
+import joblib
 import json
 from datetime import datetime
 
+from joblib import Parallel, delayed
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
@@ -15,8 +18,15 @@ import lightgbm as lgb
 
 from backend.app.advanced_feature_extractor import AdvancedFeatureExtractor
 
-# Load existing dataset
-df = pd.read_csv('ml_engine/data/phishing_dataset.csv')
+CSV_PATH = 'ml_engine/data/phishing_dataset.csv'
+PARQUET_PATH = 'ml_engine/data/phishing_dataset.parquet'
+
+# Load existing dataset - prefer the typed columnar copy over re-running
+# the CSV tokenizer and dtype inference on every retrain
+if os.path.exists(PARQUET_PATH):
+    df = pd.read_parquet(PARQUET_PATH, columns=['url', 'label'])
+else:
+    df = pd.read_csv(CSV_PATH)
 print(f"Original dataset: {len(df)} URLs")
 
 # Add more legitimate URLs with COMPLEX query strings (search engines, trackers, etc.)
@@ -85,12 +95,27 @@ new_legitimate_urls = [
 # Create new rows
 new_rows = pd.DataFrame({'url': new_legitimate_urls, 'label': 0})
 df = pd.concat([df, new_rows], ignore_index=True)
+
+# Drop rows that already exist (re-running this script re-appends the
+# same URLs) so the extractor never featurizes a URL twice
+df['url'] = df['url'].str.strip()
+before_dedup = len(df)
+df = df.drop_duplicates(subset=['url'], keep='first').reset_index(drop=True)
+if before_dedup != len(df):
+    print(f"Removed {before_dedup - len(df)} duplicate URLs")
+
 print(f"After adding complex legitimate URLs: {len(df)} URLs")
 print(f"  Phishing: {sum(df.label==1)}")
 print(f"  Legitimate: {sum(df.label==0)}")
 
-# Save updated dataset
-df.to_csv('ml_engine/data/phishing_dataset.csv', index=False)
+# Save updated dataset - Parquet is the preferred load path when a
+# parquet engine is installed, CSV stays as the portable copy; without
+# an engine the script degrades to CSV-only instead of crashing
+try:
+    df.to_parquet(PARQUET_PATH, compression='zstd')
+except (ImportError, ValueError):
+    pass
+df.to_csv(CSV_PATH, index=False)
 print("Updated dataset saved!")
 
 # Now retrain the model
@@ -99,19 +124,36 @@ print("RETRAINING MODEL")
 print("="*60)
 
 fe = AdvancedFeatureExtractor()
-X = np.array([fe.extract_features(url) for url in df['url']])
+
+# Vectorized batch extraction in 256-URL chunks fanned out across cores;
+# threads are enough because the extractor spends its time in regex and
+# NumPy calls that release the GIL
+urls = df['url'].tolist()
+chunks = [urls[i:i + 256] for i in range(0, len(urls), 256)]
+parts = Parallel(n_jobs=-1, prefer='threads')(
+    delayed(fe.extract_features_batch)(chunk) for chunk in chunks
+)
+X = np.vstack(parts)
 y = df['label'].values
 
 X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
 print(f"Train: {len(X_train)}, Test: {len(X_test)}")
 
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
+# copy=False scales the float32 splits in place instead of materializing
+# float64 copies - halves the bytes touched in the training path
+scaler = StandardScaler(copy=False)
+X_train_scaled = scaler.fit_transform(X_train).astype(np.float32, copy=False)
+X_test_scaled = scaler.transform(X_test).astype(np.float32, copy=False)
+
+# Hold out a validation slice so boosting can stop itself instead of
+# always running the full round budget
+X_tr, X_val, y_tr, y_val = train_test_split(
+    X_train_scaled, y_train, test_size=0.15, random_state=42, stratify=y_train
+)
 
 # Train with adjusted hyperparameters for better generalization
 model = lgb.LGBMClassifier(
-    n_estimators=150,
+    n_estimators=400,  # upper bound; early stopping picks the real count
     random_state=42,
     class_weight='balanced',
     max_depth=5,  # Reduced to prevent overfitting
@@ -119,9 +161,15 @@ model = lgb.LGBMClassifier(
     min_child_samples=5,  # Prevent overfitting on small samples
     reg_alpha=0.1,  # L1 regularization
     reg_lambda=0.1,  # L2 regularization
+    force_row_wise=True,  # skip LightGBM's per-run row/col-wise probe
     verbose=-1
 )
-model.fit(X_train_scaled, y_train)
+model.fit(
+    X_tr, y_tr,
+    eval_set=[(X_val, y_val)],
+    callbacks=[lgb.early_stopping(20), lgb.log_evaluation(0)]
+)
+print(f"Best iteration: {model.best_iteration_}")
 
 y_pred = model.predict(X_test_scaled)
 y_proba = model.predict_proba(X_test_scaled)[:, 1]
@@ -139,6 +187,29 @@ with open('backend/models/phishing_model.pkl', 'wb') as f:
 with open('backend/models/scaler.pkl', 'wb') as f:
     pickle.dump(scaler, f)
 
+# Uncompressed joblib copies: the API mmaps these so array buffers are
+# paged in on demand and shared read-only across workers
+joblib.dump(model, 'backend/models/phishing_model.joblib', compress=0)
+joblib.dump(scaler, 'backend/models/scaler.joblib', compress=0)
+
+# One-shot ONNX export; the API prefers this file over the pickle when
+# onnxruntime is installed. Only the classifier is exported - the
+# runtime applies the scaler itself before running the session
+try:
+    from onnxmltools import convert_lightgbm
+    from onnxmltools.convert.common.data_types import FloatTensorType
+
+    onx = convert_lightgbm(
+        model,
+        initial_types=[('input', FloatTensorType([None, X.shape[1]]))],
+        zipmap=False
+    )
+    with open('backend/models/phishing_model.onnx', 'wb') as f:
+        f.write(onx.SerializeToString())
+    print("ONNX model exported!")
+except ImportError:
+    print("onnxmltools not installed - skipping ONNX export")
+
 # Save model info
 info = {
     'best_model': 'LightGBM',
@@ -152,7 +223,8 @@ info = {
         }
     },
     'training_date': datetime.now().isoformat(),
-    'dataset_size': len(df)
+    'dataset_size': len(df),
+    'best_iteration': int(model.best_iteration_ or 0)
 }
 with open('backend/models/model_comparison.json', 'w') as f:
     json.dump(info, f, indent=2)
@@ -164,6 +236,12 @@ print("\n" + "="*60)
 print("TESTING WITH PREVIOUSLY PROBLEMATIC URLS")
 print("="*60)
 
+def score_urls(url_list):
+    """Phishing probabilities for a list of URLs in one model call"""
+    X_urls = fe.extract_features_batch(url_list)
+    return model.predict_proba(scaler.transform(X_urls))[:, 1]
+
+
 test_urls = [
     ("https://www.google.com", "Simple legitimate"),
     ("https://search.yahoo.com/search?d=%7b%22dn%22%3a%22yk%22%2c%22subdn%22%3a%22publiccompany%22%2c%22ykid%22%3a%220d14d6b9-779c-4435-a2f1-70077358e09e%22%7d&fr2=p%3ads%2cv%3aomn%2cm%3asa%2cbrws%3achrome%2cpos%3a1%2csa_mk%3a30&mkr=30&fr=mcafee&type=E210US885G0&p=Lovable", "Yahoo Search (COMPLEX)"),
@@ -172,10 +250,9 @@ test_urls = [
     ("http://google-security.tk/signin", "Phishing"),
 ]
 
-for url, desc in test_urls:
-    f = fe.extract_features(url).reshape(1, -1)
-    f_scaled = scaler.transform(f)
-    p = model.predict_proba(f_scaled)[0][1]
+probs = score_urls([url for url, _ in test_urls])
+
+for (url, desc), p in zip(test_urls, probs):
     result = "PHISHING" if p >= 0.5 else "LEGIT"
     status = "OK" if (result == "LEGIT" and "Phishing" not in desc) or (result == "PHISHING" and "Phishing" in desc) else "FAIL"
     print(f"  [{status}] {result:8} ({p*100:5.1f}%) - {desc[:40]}")
@@ -0,0 +1,55 @@
+"""
+Ahead-of-time build for the URL scan kernel
+
+Compiles scan_url into a native extension module named url_kernel, so
+deployments import it with zero JIT warmup and without numba installed
+at runtime. Run once per target platform:
+
+    python ml_engine/build_kernels.py
+
+feature_extractor prefers url_kernel when the built module is on the
+path and otherwise falls back to the JIT version, then to pure Python.
+"""
+
+import numpy as np
+from numba.pycc import CC
+
+cc = CC('url_kernel')
+
+
+@cc.export('scan_url', 'f8[::1](u1[::1])')
+def scan_url(buf):
+    """AOT twin of feature_extractor_numba.scan_url"""
+    out = np.zeros(11, dtype=np.float64)
+    hist = np.zeros(256, dtype=np.int64)
+
+    for i in range(buf.size):
+        b = buf[i]
+        hist[b] += 1
+        out[0] += b == 46   # .
+        out[1] += b == 45   # -
+        out[2] += b == 95   # _
+        out[3] += b == 47   # /
+        out[4] += b == 63   # ?
+        out[5] += b == 61   # =
+        out[6] += b == 64   # @
+        out[7] += b == 38   # &
+        is_digit = 48 <= b <= 57
+        is_alpha = (65 <= b <= 90) or (97 <= b <= 122)
+        out[8] += is_digit
+        out[9] += not (is_digit or is_alpha)
+
+    n = buf.size
+    if n:
+        entropy = 0.0
+        for k in range(256):
+            if hist[k]:
+                p = hist[k] / n
+                entropy -= p * np.log2(p)
+        out[10] = entropy
+
+    return out
+
+
+if __name__ == '__main__':
+    cc.compile()
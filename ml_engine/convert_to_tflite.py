@@ -2,7 +2,7 @@
 Convert trained model to TensorFlow Lite format for mobile deployment
 """
 
-import pickle
+import joblib
 import numpy as np
 import tensorflow as tf
 from tensorflow import keras
@@ -10,6 +10,12 @@ from pathlib import Path
 import json
 from feature_extractor import URLFeatureExtractor
 
+try:
+    import onnxmltools
+    from onnxmltools.convert.common.data_types import FloatTensorType
+except ImportError:
+    onnxmltools = None
+
 
 class ModelConverter:
     """Convert LightGBM model to TensorFlow Lite"""
@@ -17,13 +23,46 @@ class ModelConverter:
     def __init__(self, model_path="ml_engine/models/phishing_model.pkl"):
         """Load the trained LightGBM model"""
         print(f"📂 Loading model from {model_path}...")
-        with open(model_path, 'rb') as f:
-            self.lgb_model = pickle.load(f)
+        # joblib reads both plain pickles and joblib dumps, so the
+        # converter works with artifacts from either trainer
+        self.lgb_model = joblib.load(model_path)
         print("   ✅ Model loaded successfully")
         
         self.feature_extractor = URLFeatureExtractor()
         self.num_features = len(self.feature_extractor.feature_names)
     
+    def export_onnx(self, output_path="ml_engine/models/phishing_model.onnx"):
+        """
+        Convert the LightGBM model directly to ONNX
+
+        No distillation training and no approximation error - the tree
+        ensemble is translated node for node, so the exported model
+        scores exactly like the pickle.
+        """
+        if onnxmltools is None:
+            raise RuntimeError(
+                "onnxmltools is not installed; pip install onnxmltools"
+            )
+
+        print("\n📦 Converting LightGBM model to ONNX...")
+        onnx_model = onnxmltools.convert_lightgbm(
+            self.lgb_model,
+            initial_types=[
+                ('input', FloatTensorType([None, self.num_features]))
+            ],
+            zipmap=False
+        )
+
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        serialized = onnx_model.SerializeToString()
+        with open(output_path, 'wb') as f:
+            f.write(serialized)
+
+        print(f"   ✅ ONNX model saved: {output_path}")
+        print(f"   📊 Model size: {len(serialized) / 1024:.2f} KB")
+
+        return output_path
+
     def create_keras_model(self, X_sample):
         """
         Create a Keras model that mimics the LightGBM predictions
@@ -79,16 +118,41 @@ class ModelConverter:
         
         return keras_model
     
-    def convert_to_tflite(self, keras_model, output_path="ml_engine/models/phishing_model.tflite"):
-        """Convert Keras model to TFLite format"""
+    def convert_to_tflite(self, keras_model, output_path="ml_engine/models/phishing_model.tflite",
+                          X_sample=None):
+        """
+        Convert Keras model to TFLite format
+
+        With X_sample provided, applies full int8 post-training
+        quantization: activations are calibrated on the sample and the
+        model runs on the CPU's int8 kernels (~4x smaller, faster on
+        mobile). Without it, falls back to weight-only quantization.
+        """
         print(f"\n📦 Converting to TensorFlow Lite...")
-        
+
         # Convert the model
         converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
-        
+
         # Optimization (optional, reduces model size)
         converter.optimizations = [tf.lite.Optimize.DEFAULT]
-        
+
+        if X_sample is not None:
+            X_sample = np.asarray(X_sample, dtype=np.float32)
+
+            def rep_dataset():
+                # A few hundred rows are enough to calibrate the
+                # activation scales
+                for i in range(min(200, len(X_sample))):
+                    yield [X_sample[i:i + 1]]
+
+            converter.representative_dataset = rep_dataset
+            converter.target_spec.supported_ops = [
+                tf.lite.OpsSet.TFLITE_BUILTINS_INT8
+            ]
+            converter.inference_input_type = tf.int8
+            converter.inference_output_type = tf.int8
+            print("   Applying full int8 post-training quantization")
+
         tflite_model = converter.convert()
         
         # Save the model
@@ -117,18 +181,29 @@ class ModelConverter:
         print("\nTest Results:")
         print("="*60)
         
+        in_scale, in_zero = input_details[0]['quantization']
+        out_scale, out_zero = output_details[0]['quantization']
+
         for url in test_urls:
             # Extract features
             features = self.feature_extractor.extract_features(url)
             features = features.reshape(1, -1).astype(np.float32)
-            
+
+            # Quantize the input when the model carries int8 I/O
+            if in_scale:
+                features = np.clip(
+                    np.round(features / in_scale + in_zero), -128, 127
+                ).astype(input_details[0]['dtype'])
+
             # Run inference
             interpreter.set_tensor(input_details[0]['index'], features)
             interpreter.invoke()
-            
+
             # Get prediction
             output = interpreter.get_tensor(output_details[0]['index'])
-            probability = output[0][0]
+            probability = float(output[0][0])
+            if out_scale:
+                probability = (probability - out_zero) * out_scale
             prediction = 'PHISHING' if probability > 0.5 else 'LEGITIMATE'
             confidence = probability if probability > 0.5 else 1 - probability
             
@@ -154,7 +229,12 @@ def create_sample_training_data():
     extractor = URLFeatureExtractor()
     X = extractor.extract_batch(df['url'].values)
     y = df['label'].values
-    
+
+    # float16 is plenty for 20 distillation inputs and halves the memory
+    # the sample occupies; consumers (LightGBM predict, Keras fit, the
+    # int8 calibration) upcast to float32 internally
+    X = X.astype(np.float16)
+
     return X, y
 
 
@@ -167,7 +247,21 @@ def main():
     try:
         # Load LightGBM model
         converter = ModelConverter()
-        
+
+        # Preferred path: translate the trees straight to ONNX - no
+        # distillation training and no accuracy loss
+        if onnxmltools is not None:
+            onnx_path = converter.export_onnx()
+            print("\n" + "=" * 60)
+            print("✅ CONVERSION COMPLETE!")
+            print("=" * 60)
+            print(f"\nGenerated file: {onnx_path}")
+            print("Serve it with onnxruntime (desktop/server) or ORT Mobile.")
+            print("Skipping Keras distillation; install without onnxmltools")
+            print("to fall back to the TFLite pipeline.")
+            return
+
+        # Fallback: distill into a small Keras net and export TFLite
         # Load or create training data
         print("\n📊 Preparing training data...")
         X_train, y_train = create_sample_training_data()
@@ -181,8 +275,9 @@ def main():
         keras_model.save(keras_path)
         print(f"\n💾 Keras model saved: {keras_path}")
         
-        # Convert to TFLite
-        tflite_path = converter.convert_to_tflite(keras_model)
+        # Convert to TFLite, calibrating int8 quantization on the
+        # training sample
+        tflite_path = converter.convert_to_tflite(keras_model, X_sample=X_train)
         
         # Test the model
         test_urls = [
@@ -2,6 +2,7 @@
 Enhanced Dataset with More Realistic URLs
 """
 
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
@@ -261,25 +262,24 @@ def create_enhanced_dataset():
         "https://www.tripadvisor.com",
     ]
     
-    # Create DataFrame
-    df_phishing = pd.DataFrame({
-        'url': phishing_urls,
-        'label': 1  # 1 = phishing
-    })
-    
-    df_legitimate = pd.DataFrame({
-        'url': legitimate_urls,
-        'label': 0  # 0 = legitimate
-    })
-    
-    # Combine and shuffle
-    df = pd.concat([df_phishing, df_legitimate], ignore_index=True)
-    df = df.sample(frac=1, random_state=42).reset_index(drop=True)
-    
-    # Save
+    # One URL array and one int8 label array, shuffled with a single
+    # permutation - no intermediate DataFrames or sampled copies
+    urls = np.asarray(phishing_urls + legitimate_urls, dtype=object)
+    labels = np.concatenate([
+        np.ones(len(phishing_urls), dtype=np.int8),   # 1 = phishing
+        np.zeros(len(legitimate_urls), dtype=np.int8)  # 0 = legitimate
+    ])
+
+    rng = np.random.default_rng(42)
+    idx = rng.permutation(urls.size)
+    df = pd.DataFrame({'url': urls[idx], 'label': labels[idx]})
+
+    # Save (plus a gzip copy for shipping; the pipeline reads the
+    # plain CSV)
     output_path = "ml_engine/data/phishing_dataset.csv"
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(output_path, index=False)
+    df.to_csv(output_path + '.gz', index=False, compression='gzip')
     
     print("=" * 60)
     print("ENHANCED DATASET CREATED")
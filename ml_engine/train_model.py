@@ -3,29 +3,39 @@ Machine Learning Model Training Script
 Trains LightGBM classifier for phishing detection
 """
 
+import os
 import pandas as pd
 import numpy as np
 import pickle
 import json
 from pathlib import Path
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import (
-    accuracy_score, 
-    precision_score, 
-    recall_score, 
-    f1_score,
-    confusion_matrix,
-    classification_report
-)
+from sklearn.metrics import classification_report
 import lightgbm as lgb
-from feature_extractor import URLFeatureExtractor
+from joblib import Parallel, delayed
+from feature_extractor import URLFeatureExtractor, extract_features_cached, _fast_parse
 import matplotlib.pyplot as plt
 import seaborn as sns
 
 
 class PhishingDetectionModel:
     """Phishing URL Detection Model Trainer"""
-    
+
+    # Hosts that never need a model pass; a frozenset probe is ~100x
+    # cheaper than feature extraction plus tree traversal. Exact netloc
+    # matches only - lookalike hosts still go through the model.
+    _KNOWN_SAFE = frozenset({
+        'www.google.com', 'google.com', 'mail.google.com',
+        'drive.google.com', 'docs.google.com', 'accounts.google.com',
+        'www.youtube.com', 'www.facebook.com', 'www.amazon.com',
+        'www.wikipedia.org', 'www.twitter.com', 'www.instagram.com',
+        'www.linkedin.com', 'www.reddit.com', 'www.netflix.com',
+        'www.microsoft.com', 'login.microsoft.com',
+        'account.microsoft.com', 'www.apple.com', 'www.github.com',
+        'github.com', 'www.stackoverflow.com', 'stackoverflow.com',
+        'www.paypal.com', 'www.ebay.com',
+    })
+
     def __init__(self):
         self.feature_extractor = URLFeatureExtractor()
         self.model = None
@@ -34,7 +44,13 @@ class PhishingDetectionModel:
     def load_data(self, csv_path="ml_engine/data/phishing_dataset.csv"):
         """Load dataset from CSV"""
         print(f"📂 Loading dataset from {csv_path}...")
-        df = pd.read_csv(csv_path)
+        # PyArrow's multithreaded reader when available; typed columns
+        # either way (int8 labels instead of inferred int64)
+        try:
+            df = pd.read_csv(csv_path, dtype={'url': 'string', 'label': 'int8'},
+                             engine='pyarrow')
+        except (ImportError, ValueError):
+            df = pd.read_csv(csv_path, dtype={'url': 'string', 'label': np.int8})
         print(f"   Loaded {len(df)} samples")
         return df
     
@@ -45,8 +61,18 @@ class PhishingDetectionModel:
         urls = df['url'].values
         labels = df['label'].values
         
-        # Extract features
-        X = self.feature_extractor.extract_batch(urls)
+        # Chunked thread-parallel extraction; the pandas/NumPy/regex C
+        # sections release the GIL, so chunks run across cores. float32
+        # matches LightGBM's internal bins.
+        chunks = np.array_split(
+            np.asarray(urls, dtype=object),
+            max(1, (os.cpu_count() or 1) * 2)
+        )
+        parts = Parallel(n_jobs=-1, prefer='threads')(
+            delayed(self.feature_extractor.extract_batch)(list(chunk))
+            for chunk in chunks if len(chunk)
+        )
+        X = np.vstack(parts).astype(np.float32, copy=False)
         y = labels
         
         print(f"   Feature matrix shape: {X.shape}")
@@ -66,10 +92,24 @@ class PhishingDetectionModel:
         print(f"   Training samples: {len(X_train)}")
         print(f"   Testing samples: {len(X_test)}")
         
-        # Create LightGBM datasets
-        train_data = lgb.Dataset(X_train, label=y_train)
-        test_data = lgb.Dataset(X_test, label=y_test, reference=train_data)
-        
+        # Create LightGBM datasets. Declaring the binary columns as
+        # categorical gives them 2-bin histograms instead of dense float
+        # bins, and free_raw_data drops the raw matrix once binned.
+        feature_name = self.feature_extractor.feature_names
+        train_data = lgb.Dataset(
+            X_train,
+            label=y_train.astype(np.int8),
+            feature_name=feature_name,
+            categorical_feature=['has_ip', 'has_https'],
+            free_raw_data=True
+        )
+        test_data = lgb.Dataset(
+            X_test,
+            label=y_test.astype(np.int8),
+            reference=train_data,
+            free_raw_data=True
+        )
+
         # Model parameters
         params = {
             'objective': 'binary',
@@ -80,18 +120,40 @@ class PhishingDetectionModel:
             'feature_fraction': 0.9,
             'bagging_fraction': 0.8,
             'bagging_freq': 5,
+            'num_threads': os.cpu_count(),
+            # 63 bins keep per-feature histograms cache-resident and are
+            # plenty for these small-integer features; sampling caps bin
+            # construction cost as the dataset grows
+            'max_bin': 63,
+            'bin_construct_sample_cnt': min(200000, len(X_train)),
+            # Set LGBM_DEVICE=gpu (or cuda) to build histograms on the
+            # GPU for large datasets
+            'device_type': os.environ.get('LGBM_DEVICE', 'cpu'),
             'verbose': 0
         }
-        
+
         # Train
         print("   Training in progress...")
-        self.model = lgb.train(
-            params,
-            train_data,
-            num_boost_round=100,
-            valid_sets=[test_data],
-            callbacks=[lgb.early_stopping(stopping_rounds=10)]
-        )
+        try:
+            self.model = lgb.train(
+                params,
+                train_data,
+                num_boost_round=100,
+                valid_sets=[test_data],
+                callbacks=[lgb.early_stopping(stopping_rounds=10)]
+            )
+        except lgb.basic.LightGBMError:
+            if params['device_type'] == 'cpu':
+                raise
+            print("   ⚠️  GPU training unavailable, falling back to CPU")
+            params['device_type'] = 'cpu'
+            self.model = lgb.train(
+                params,
+                train_data,
+                num_boost_round=100,
+                valid_sets=[test_data],
+                callbacks=[lgb.early_stopping(stopping_rounds=10)]
+            )
         
         print("   ✅ Training complete!")
         
@@ -100,27 +162,34 @@ class PhishingDetectionModel:
         
         return X_train, X_test, y_train, y_test
     
-    def evaluate(self, X_test, y_test):
+    def evaluate(self, X_test, y_test, verbose=True):
         """Evaluate model performance"""
         print("\n📊 Evaluating model performance...")
-        
+
         # Predictions
         y_pred_proba = self.model.predict(X_test)
-        y_pred = (y_pred_proba > 0.5).astype(int)
-        
-        # Metrics
-        accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred)
-        recall = recall_score(y_test, y_pred)
-        f1 = f1_score(y_test, y_pred)
-        
+        y_pred = (y_pred_proba > 0.5).astype(np.int64)
+
+        # One bincount pass builds the confusion matrix; the four
+        # metrics fall out of its entries in O(1) instead of a full
+        # sklearn scan each
+        y_true = np.asarray(y_test, dtype=np.int64)
+        cm = np.bincount(2 * y_true + y_pred, minlength=4).reshape(2, 2)
+        tn, fp, fn, tp = cm.ravel()
+
+        accuracy = (tn + tp) / cm.sum()
+        precision = tp / (tp + fp) if (tp + fp) else 0.0
+        recall = tp / (tp + fn) if (tp + fn) else 0.0
+        f1 = (2 * precision * recall / (precision + recall)
+              if (precision + recall) else 0.0)
+
         self.metrics = {
-            'accuracy': accuracy,
-            'precision': precision,
-            'recall': recall,
-            'f1_score': f1
+            'accuracy': float(accuracy),
+            'precision': float(precision),
+            'recall': float(recall),
+            'f1_score': float(f1)
         }
-        
+
         print(f"\n{'='*50}")
         print(f"   PERFORMANCE METRICS")
         print(f"{'='*50}")
@@ -129,14 +198,14 @@ class PhishingDetectionModel:
         print(f"   Recall:    {recall:.4f} ({recall*100:.2f}%)")
         print(f"   F1-Score:  {f1:.4f} ({f1*100:.2f}%)")
         print(f"{'='*50}\n")
-        
-        # Classification report
-        print("Detailed Classification Report:")
-        print(classification_report(y_test, y_pred, 
-                                   target_names=['Legitimate', 'Phishing']))
-        
+
+        # Classification report (string-heavy; skip unless asked)
+        if verbose:
+            print("Detailed Classification Report:")
+            print(classification_report(y_test, y_pred,
+                                        target_names=['Legitimate', 'Phishing']))
+
         # Confusion matrix
-        cm = confusion_matrix(y_test, y_pred)
         print(f"\nConfusion Matrix:")
         print(f"                 Predicted")
         print(f"              Legit  Phishing")
@@ -145,45 +214,103 @@ class PhishingDetectionModel:
         
         return self.metrics
     
-    def save_model(self, output_dir="ml_engine/models"):
+    def save_model(self, output_dir="ml_engine/models", legacy_pickle=True):
         """Save trained model and metadata"""
         print(f"💾 Saving model to {output_dir}...")
-        
-        Path(output_dir).mkdir(parents=True, exist_ok=True)
-        
-        # Save LightGBM model
-        model_path = f"{output_dir}/phishing_model.pkl"
-        with open(model_path, 'wb') as f:
-            pickle.dump(self.model, f)
+
+        out = Path(output_dir)
+        out.mkdir(parents=True, exist_ok=True)
+
+        # Save in LightGBM's native format - trees only, pruned to the
+        # best iteration, loads in a few ms vs. unpickling the Booster
+        model_path = out / 'phishing_model.txt'
+        self.model.save_model(
+            str(model_path), num_iteration=self.model.best_iteration
+        )
         print(f"   ✅ Model saved: {model_path}")
-        
+
+        # Legacy pickle kept (default on) for the TFLite converter,
+        # which still unpickles the model; pass legacy_pickle=False
+        # once every consumer reads the text format
+        if legacy_pickle:
+            pickle_path = out / 'phishing_model.pkl'
+            with open(pickle_path, 'wb') as f:
+                pickle.dump(self.model, f, protocol=pickle.HIGHEST_PROTOCOL)
+            print(f"   ✅ Pickle saved: {pickle_path}")
+
         # Save feature names
-        features_path = f"{output_dir}/feature_names.json"
-        with open(features_path, 'w') as f:
-            json.dump(self.feature_extractor.feature_names, f, indent=2)
+        features_path = out / 'feature_names.json'
+        features_path.write_text(
+            json.dumps(self.feature_extractor.feature_names, indent=2)
+        )
         print(f"   ✅ Features saved: {features_path}")
-        
+
         # Save metrics
-        metrics_path = f"{output_dir}/metrics.json"
-        with open(metrics_path, 'w') as f:
-            json.dump(self.metrics, f, indent=2)
+        metrics_path = out / 'metrics.json'
+        metrics_path.write_text(json.dumps(self.metrics, indent=2))
         print(f"   ✅ Metrics saved: {metrics_path}")
-        
+
         print("\n✅ All files saved successfully!")
     
-    def predict(self, url):
-        """Predict single URL"""
-        features = self.feature_extractor.extract_features(url)
-        features = features.reshape(1, -1)
-        
-        probability = self.model.predict(features)[0]
-        prediction = 1 if probability > 0.5 else 0
-        
-        return {
-            'prediction': 'phishing' if prediction == 1 else 'legitimate',
-            'confidence': float(probability if prediction == 1 else 1 - probability),
-            'label': int(prediction)
-        }
+    @classmethod
+    def load(cls, model_dir="ml_engine/models"):
+        """Load a trained model from its native text file"""
+        trainer = cls()
+        trainer.model = lgb.Booster(
+            model_file=f"{model_dir}/phishing_model.txt"
+        )
+        return trainer
+
+    def predict(self, urls):
+        """
+        Predict one URL or a batch of URLs
+
+        A single string returns one result dict; a list returns a list
+        of dicts. The whole batch goes through LightGBM in one call, so
+        tree traversal amortizes across rows instead of paying the
+        per-call overhead N times.
+        """
+        single = isinstance(urls, str)
+        url_list = [urls] if single else list(urls)
+
+        # Allow-list pre-filter: exact known-safe hosts skip the model
+        # entirely. No phishing-side shortcut - heuristics like "has an
+        # @" are model features, not verdicts, so those URLs still get
+        # a calibrated score.
+        results = [None] * len(url_list)
+        pending = []
+        for i, url in enumerate(url_list):
+            if _fast_parse(url)[0] in self._KNOWN_SAFE:
+                results[i] = {
+                    'prediction': 'legitimate',
+                    'confidence': 1.0,
+                    'label': 0
+                }
+            else:
+                pending.append(i)
+
+        if pending:
+            if single:
+                # Serving path: repeat URLs hit the extraction cache
+                X = extract_features_cached(url_list[0]).reshape(1, -1)
+            else:
+                X = self.feature_extractor.extract_batch(
+                    [url_list[i] for i in pending]
+                )
+            proba = self.model.predict(
+                X, num_iteration=self.model.best_iteration
+            )
+            pred = (proba > 0.5).astype(np.int8)
+            conf = np.where(pred == 1, proba, 1 - proba)
+
+            for i, p, c in zip(pending, pred, conf):
+                results[i] = {
+                    'prediction': 'phishing' if p else 'legitimate',
+                    'confidence': float(c),
+                    'label': int(p)
+                }
+
+        return results[0] if single else results
 
 
 def main():
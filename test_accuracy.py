@@ -1,8 +1,11 @@
-import pickle
+import numpy as np
+from joblib import load
 from backend.app.advanced_feature_extractor import AdvancedFeatureExtractor
 
-model = pickle.load(open('backend/models/phishing_model.pkl', 'rb'))
-scaler = pickle.load(open('backend/models/scaler.pkl', 'rb'))
+# joblib reads both the legacy pickles and the new joblib dumps;
+# mmap_mode pages array payloads lazily instead of copying them in
+model = load('backend/models/phishing_model.pkl', mmap_mode='r')
+scaler = load('backend/models/scaler.pkl', mmap_mode='r')
 fe = AdvancedFeatureExtractor()
 
 tests = [
@@ -29,9 +32,12 @@ print("="*70)
 correct = 0
 total = len(tests)
 
-for url, expected in tests:
-    f = fe.extract_features(url).reshape(1,-1)
-    p = model.predict_proba(scaler.transform(f))[0][1]
+# One stacked matrix and one predict_proba call for the whole suite;
+# the per-call model overhead is paid once instead of per URL
+feats = np.vstack([fe.extract_features(url) for url, _ in tests])
+probs = model.predict_proba(scaler.transform(feats))[:, 1]
+
+for (url, expected), p in zip(tests, probs):
     pred = "phishing" if p >= 0.5 else "legitimate"
     status = "PASS" if pred == expected else "FAIL"
     if pred == expected:
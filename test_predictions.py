@@ -5,9 +5,11 @@ Quick test to check model predictions
 import sys
 sys.path.append('backend')
 
-from app.predictor import PhishingPredictor
+from app.predictor import get_predictor
 
-predictor = PhishingPredictor()
+# The singleton loads the model and scaler once; every predict() after
+# that reuses the warm instance (and its per-URL score cache)
+predictor = get_predictor()
 
 test_urls = [
     ("https://www.google.com", "legitimate"),